@@ -0,0 +1,209 @@
+import json
+import sqlite3
+import sys
+
+from config import ANKI_CACHE
+
+FETCH_CHUNK_SIZE = 1000  # Notes or cards per request while syncing, only one response is held at a time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    note_id INTEGER PRIMARY KEY,
+    mod INTEGER NOT NULL,
+    model_name TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    fields TEXT NOT NULL,
+    cards TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cards (
+    card_id INTEGER PRIMARY KEY,
+    note_id INTEGER NOT NULL,
+    mod INTEGER NOT NULL,
+    interval INTEGER NOT NULL,
+    model_name TEXT NOT NULL,
+    deck_name TEXT NOT NULL
+);
+"""
+
+
+class NoteRecord:
+    """A note projected to a few of its fields, see KnowledgeCache.note_records().
+
+    `values` holds the requested field values in the requested order, None for a
+    field the note doesn't have. Note types and tags are interned, so the records
+    of a collection share a handful of strings.
+    """
+    __slots__ = ('note_id', 'mod', 'model_name', 'tags', 'cards', 'values')
+
+    def __init__(self, note_id, mod, model_name, tags, cards, values):
+        self.note_id = note_id
+        self.mod = mod
+        self.model_name = model_name
+        self.tags = tags
+        self.cards = cards
+        self.values = values
+
+    def fields(self, names):
+        """The notesInfo-shaped fields of the record, names being the fields it was projected to."""
+        return {name: {'value': value} for name, value in zip(names, self.values) if value is not None}
+
+    def to_note(self, names):
+        """The notesInfo-shaped dict of the record."""
+        return {
+            'noteId': self.note_id,
+            'mod': self.mod,
+            'modelName': self.model_name,
+            'tags': list(self.tags),
+            'fields': self.fields(names),
+            'cards': list(self.cards),
+        }
+
+
+def _field_path(name):
+    # Quoted for spaces and the like, Anki doesn't allow double quotes in field names
+    return f'$."{name}".value'
+
+
+class KnowledgeCache:
+    """Local SQLite copy of Anki note and card state, refreshed by modification time.
+
+    Only notes and cards whose `mod` differs from the cached value are downloaded
+    again, so repeated runs cost one notesModTime/cardsModTime call plus the delta,
+    and the requested ones Anki no longer returns are dropped from the cache.
+    `downloads` counts the notes and cards downloaded so far, so a caller can tell
+    whether anything changed in Anki between two reads. Rows read once are kept
+    decoded in memory until they change, which makes repeated reads by a
+    long-running process cheap. Downloads are streamed FETCH_CHUNK_SIZE items per
+    request straight into SQLite. Passing `fields` to the readers keeps only those
+    fields, picked out by SQLite, in NoteRecords instead of every field of every note.
+    """
+
+    def __init__(self, anki, path=ANKI_CACHE):
+        self.anki = anki
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.downloads = 0
+        self.notes = {}
+        self.records = {}  # fields: {note_id: NoteRecord}
+        self.cards = {}
+
+    def _stream(self, action, param, ids):
+        """Yield the results of action for ids, one request of FETCH_CHUNK_SIZE ids at a time."""
+        # Batching the chunks in `multi` requests held every response of a sync in memory at once
+        for start in range(0, len(ids), FETCH_CHUNK_SIZE):
+            yield [item for item in self.anki.invoke(action, **{param: ids[start:start + FETCH_CHUNK_SIZE]}) if item]
+
+    def _rows(self, table, key, columns, ids):
+        query = f'SELECT {columns} FROM {table} WHERE {key} IN (SELECT value FROM json_each(?))'
+        return {row[0]: row for row in self.db.execute(query, (json.dumps(ids),))}
+
+    def _stale(self, table, key, ids, mod_times, id_field):
+        """Return (ids whose mod differs from the cached one, cached ids Anki no longer has), deleting the latter."""
+        # Only the requested rows are read, not the whole table on every sync
+        cached = {row[0]: row[1] for row in self._rows(table, key, f'{key}, mod', ids).values()}
+        current = {item[id_field]: item['mod'] for item in mod_times if item}
+        deleted = [item_id for item_id in cached if item_id not in current]
+        if deleted:
+            self.db.execute(f'DELETE FROM {table} WHERE {key} IN (SELECT value FROM json_each(?))',
+                            (json.dumps(deleted),))
+        return [item_id for item_id, mod in current.items() if cached.get(item_id) != mod], deleted
+
+    def sync_notes(self, note_ids):
+        """Download notes that changed since they were cached."""
+        if not note_ids:
+            return 0
+        mod_times = self.anki.invoke('notesModTime', notes=note_ids)
+        stale, deleted = self._stale('notes', 'note_id', note_ids, mod_times, 'noteId')
+        for note_id in stale + deleted:
+            self.notes.pop(note_id, None)
+            for records in self.records.values():
+                records.pop(note_id, None)
+        for notes in self._stream('notesInfo', 'notes', stale):
+            self.db.executemany('INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?, ?, ?)', [
+                (note['noteId'], note['mod'], note['modelName'],
+                 json.dumps(note['tags'], ensure_ascii=False),
+                 json.dumps(note['fields'], ensure_ascii=False),
+                 json.dumps(note['cards']))
+                for note in notes
+            ])
+        self.db.commit()
+        self.downloads += len(stale)
+        return len(stale)
+
+    def sync_cards(self, card_ids):
+        """Download cards that changed since they were cached."""
+        if not card_ids:
+            return 0
+        mod_times = self.anki.invoke('cardsModTime', cards=card_ids)
+        stale, deleted = self._stale('cards', 'card_id', card_ids, mod_times, 'cardId')
+        for card_id in stale + deleted:
+            self.cards.pop(card_id, None)
+        for cards in self._stream('cardsInfo', 'cards', stale):
+            self.db.executemany('INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?, ?, ?)', [
+                (card['cardId'], card['note'], card['mod'], card['interval'],
+                 card['modelName'], card['deckName'])
+                for card in cards
+            ])
+        self.db.commit()
+        self.downloads += len(stale)
+        return len(stale)
+
+    def note_records(self, note_ids, fields):
+        """Return a NoteRecord holding the values of fields for each of note_ids, syncing changed notes first."""
+        fields = tuple(fields)
+        self.sync_notes(note_ids)
+        records = self.records.setdefault(fields, {})
+        missing = [note_id for note_id in note_ids if note_id not in records]
+        if missing:
+            columns = ''.join(', json_extract(fields, ?)' for _ in fields)
+            query = (f'SELECT note_id, mod, model_name, tags, cards{columns} FROM notes '
+                     f'WHERE note_id IN (SELECT value FROM json_each(?))')
+            for note_id, mod, model_name, tags, cards, *values in self.db.execute(
+                    query, (*map(_field_path, fields), json.dumps(missing))):
+                records[note_id] = NoteRecord(note_id, mod, sys.intern(model_name),
+                                              tuple(sys.intern(tag) for tag in json.loads(tags)),
+                                              tuple(json.loads(cards)), tuple(values))
+        return [records[note_id] for note_id in note_ids if note_id in records]
+
+    def note_data(self, note_ids, fields=None):
+        """Return notesInfo-shaped dicts for note_ids, syncing changed notes first.
+
+        With fields, the dicts only hold those fields and are built from note_records().
+        """
+        if fields is not None:
+            return [record.to_note(fields) for record in self.note_records(note_ids, fields)]
+        self.sync_notes(note_ids)
+        missing = [note_id for note_id in note_ids if note_id not in self.notes]
+        if missing:
+            rows = self._rows('notes', 'note_id', 'note_id, mod, model_name, tags, fields, cards', missing)
+            for note_id, mod, model_name, tags, fields, cards in rows.values():
+                self.notes[note_id] = {
+                    'noteId': note_id,
+                    'mod': mod,
+                    'modelName': model_name,
+                    'tags': json.loads(tags),
+                    'fields': json.loads(fields),
+                    'cards': json.loads(cards),
+                }
+        return [self.notes[note_id] for note_id in note_ids if note_id in self.notes]
+
+    def card_data(self, card_ids, fields=None):
+        """Return cardsInfo-shaped dicts for card_ids, including the fields of their notes, or only fields."""
+        self.sync_cards(card_ids)
+        missing = [card_id for card_id in card_ids if card_id not in self.cards]
+        if missing:
+            rows = self._rows('cards', 'card_id', 'card_id, note_id, mod, interval, model_name, deck_name', missing)
+            for card_id, note_id, mod, interval, model_name, deck_name in rows.values():
+                # A tuple with interned names takes a fraction of a dict per card
+                self.cards[card_id] = (card_id, note_id, mod, interval, sys.intern(model_name), sys.intern(deck_name))
+        known = [self.cards[card_id] for card_id in card_ids if card_id in self.cards]
+        note_ids = list({card[1] for card in known})
+        if fields is None:
+            notes = {note['noteId']: note['fields'] for note in self.note_data(note_ids)}
+        else:
+            notes = {record.note_id: record.fields(fields) for record in self.note_records(note_ids, fields)}
+        return [
+            {'cardId': card_id, 'note': note_id, 'mod': mod, 'interval': interval,
+             'modelName': model_name, 'deckName': deck_name, 'fields': notes[note_id]}
+            for card_id, note_id, mod, interval, model_name, deck_name in known if note_id in notes
+        ]
@@ -0,0 +1,144 @@
+import time
+from contextlib import contextmanager
+
+from instrumentation import payload_sizes
+
+ANKI_CONNECT_URL = "http://localhost:8765"
+ANKI_CONNECT_VERSION = 6
+MULTI_CHUNK_SIZE = 250
+
+
+class AnkiConnectError(Exception):
+    pass
+
+
+class AnkiUnreachable(AnkiConnectError):
+    """Anki isn't running, or AnkiConnect isn't installed or listening on the URL."""
+
+
+class PendingResult:
+    """Result slot for a queued action, filled in when the queue is flushed."""
+    __slots__ = ('action', 'params', 'done', 'value', 'error')
+
+    def __init__(self, action, params):
+        self.action = action
+        self.params = params
+        self.done = False
+        self.value = None
+        self.error = None
+
+    def resolve(self, value, error):
+        self.done = True
+        self.value = value
+        self.error = error
+
+    def result(self):
+        if not self.done:
+            raise AnkiConnectError(f'{self.action} has not been sent yet, call flush() first')
+        if self.error is not None:
+            raise AnkiConnectError(f'{self.action}: {self.error}')
+        return self.value
+
+
+class AnkiConnect:
+    """AnkiConnect client that reuses one HTTP session and can batch actions through `multi`.
+
+    Requests and actions are accounted to `recorder`, an instrumentation.Recorder, if given.
+    """
+
+    def __init__(self, url=ANKI_CONNECT_URL, chunk_size=MULTI_CHUNK_SIZE, session=None, recorder=None):
+        self.url = url
+        self.chunk_size = chunk_size
+        self._session = session
+        self.recorder = recorder
+        self.pending = []
+        self._batches = []
+
+    @property
+    def session(self):
+        if self._session is None:
+            # Imported on first use, it is most of a command's startup time otherwise
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    def _post(self, action, params):
+        request = {'action': action, 'params': params, 'version': ANKI_CONNECT_VERSION}
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.url, json=request)
+        except OSError as e:  # requests' exceptions are OSErrors
+            raise AnkiUnreachable(f'could not reach AnkiConnect at {self.url}: {e}') from e
+        if self.recorder is not None:
+            self.recorder.record('anki', action, time.perf_counter() - start, *payload_sizes(response))
+        response = response.json()
+        if len(response) != 2:
+            raise AnkiConnectError('response has an unexpected number of fields')
+        if 'error' not in response:
+            raise AnkiConnectError('response is missing required error field')
+        if 'result' not in response:
+            raise AnkiConnectError('response is missing required result field')
+        if response['error'] is not None:
+            raise AnkiConnectError(response['error'])
+        return response['result']
+
+    def invoke(self, action, **params):
+        """Send a single action immediately and return its result."""
+        if self.recorder is not None:
+            self.recorder.count('anki', action)
+        return self._post(action, params)
+
+    def queue(self, action, **params):
+        """Queue an action for the next flush and return its PendingResult."""
+        pending = PendingResult(action, params)
+        self.pending.append(pending)
+        for batch in self._batches:
+            batch.append(pending)
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+        return pending
+
+    def flush(self):
+        """Send every queued action in `multi` chunks and resolve their results."""
+        pending, self.pending = self.pending, []
+        for start in range(0, len(pending), self.chunk_size):
+            chunk = pending[start:start + self.chunk_size]
+            actions = [
+                {'action': p.action, 'params': p.params, 'version': ANKI_CONNECT_VERSION}
+                for p in chunk
+            ]
+            if self.recorder is not None:
+                for p in chunk:
+                    self.recorder.count('anki', p.action)
+            results = self._post('multi', {'actions': actions})
+            if len(results) != len(chunk):
+                raise AnkiConnectError('multi returned an unexpected number of results')
+            for p, result in zip(chunk, results):
+                if isinstance(result, dict) and set(result) == {'result', 'error'}:
+                    p.resolve(result['result'], result['error'])
+                else:
+                    p.resolve(result, None)
+        return pending
+
+    def invoke_all(self, action, params_list):
+        """Run the same action for each params dict in as few requests as possible."""
+        pending = [self.queue(action, **params) for params in params_list]
+        self.flush()
+        return [p.result() for p in pending]
+
+    @contextmanager
+    def batch(self):
+        """Queue everything inside the block, flush on exit and raise the first error."""
+        queued = []
+        self._batches.append(queued)
+        try:
+            yield self
+        finally:
+            self._batches.remove(queued)
+        self.flush()
+        for pending in queued:
+            pending.result()
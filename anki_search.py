@@ -0,0 +1,56 @@
+"""Compose Anki search strings, so Anki does the filtering and only the matching ids come back.
+
+    all_of(tag('new'), prop('ivl', '>=', 21))                             -> tag:new prop:ivl>=21
+    all_of(note_type('yomitan Japanese'), field('Kanji'), tag('locked'))  -> "note:yomitan Japanese" Kanji: tag:locked
+    all_of(tag('locked'), negate(state('suspended')))                     -> tag:locked -is:suspended
+
+Values are matched the way Anki matches them, so `*` and `_` stay wildcards.
+"""
+PROP_OPERATORS = ('<', '>', '<=', '>=', '=', '!=')
+_NEEDS_QUOTES = frozenset(' \t\n"()\\')
+
+
+def term(key, value):
+    """`key:value`, quoted as a whole when value holds anything Anki would split the search on."""
+    text = f"{key}:{value}"
+    if not _NEEDS_QUOTES.intersection(text) and not text.startswith('-'):
+        return text
+    return '"{}"'.format(text.replace('\\', '\\\\').replace('"', '\\"'))
+
+
+def tag(name):
+    return term('tag', name)
+
+
+def note_type(name):
+    return term('note', name)
+
+
+def deck(name):
+    return term('deck', name)
+
+
+def field(name, value=''):
+    """Notes whose field name is exactly value, empty by default."""
+    return term(name, value)
+
+
+def state(name):
+    """`is:` searches, such as suspended, new or due."""
+    return term('is', name)
+
+
+def prop(name, operator, value):
+    """Card property comparisons, e.g. prop('ivl', '>=', 21) for an interval of at least 21 days."""
+    if operator not in PROP_OPERATORS:
+        raise ValueError(f"unsupported prop operator {operator!r}, expected one of {', '.join(PROP_OPERATORS)}")
+    return f"prop:{name}{operator}{value}"
+
+
+def negate(search):
+    return f"-{search}"
+
+
+def all_of(*searches):
+    """Cards matching every search, empty ones are left out."""
+    return ' '.join(search for search in searches if search)
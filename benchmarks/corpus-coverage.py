@@ -0,0 +1,97 @@
+"""Measure the throughput of corpus_coverage.count_kanji() on a synthetic multi-GB corpus.
+
+The corpus is a block of sentences built from the JLPT vocabulary, particles,
+punctuation and some ASCII lines, written over and over with each copy rotated
+so chunk boundaries fall somewhere new every time. Every copy holds the same
+characters, so the expected counts are known exactly and each run is checked
+against them. The corpus is written to a temporary directory and deleted after.
+Run from any directory, e.g. the repository root:
+
+    python benchmarks/corpus-coverage.py [--size 2048] [--jobs 1 4]
+"""
+import argparse
+import csv
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from corpus_coverage import count_kanji
+from fixtures import JLPT_VOCAB_DIR
+from japanese_text import extract_kanji
+
+BLOCK_CHARACTERS = 2_000_000
+PARTICLES = ['は', 'が', 'を', 'に', 'で', 'と', 'の', 'も', 'から', 'まで', 'です', 'ました', 'ている', 'でしょう']
+ASCII_LINES = ["Chapter {}\n", "https://example.com/{}\n", "[{}] 00:01:02,345 --> 00:01:04,567\n"]
+
+
+def make_block(seed):
+    rng = random.Random(seed)
+    words = []
+    for path in sorted(glob.glob(os.path.join(JLPT_VOCAB_DIR, "n*.csv"))):
+        with open(path, 'r', encoding='utf-8') as file:
+            words.extend(row['kanji'] or row['kana'] for row in csv.DictReader(file))
+    parts, length = [], 0
+    while length < BLOCK_CHARACTERS:
+        r = rng.random()
+        part = rng.choice(words) + (rng.choice(PARTICLES) if r < 0.6 else '')
+        if r > 0.9:
+            part += '。\n' if r > 0.97 else '、'
+        if r > 0.995:
+            part += rng.choice(ASCII_LINES).format(rng.randint(1, 9999))
+        parts.append(part)
+        length += len(part)
+    return ''.join(parts)
+
+
+def write_corpus(path, block, size, seed):
+    rng = random.Random(seed)
+    copies = 0
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        while file.tell() < size:
+            cut = rng.randrange(len(block))
+            file.write(block[cut:])
+            file.write(block[:cut])
+            copies += 1
+    return copies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the corpus kanji counter.")
+    parser.add_argument('--size', type=int, default=2048, help="corpus size in MB")
+    parser.add_argument('--jobs', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}),
+                        help="process counts to run with")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    block = make_block(args.seed)
+    block_counts = Counter(extract_kanji(block))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'corpus.txt')
+        start = time.perf_counter()
+        copies = write_corpus(path, block, args.size * 2 ** 20, args.seed)
+        size = os.path.getsize(path) / 2 ** 20
+        print(f"{size:.0f} MB corpus ({copies} rotated copies of a {len(block)} character block, "
+              f"{len(block_counts)} different kanji) written in {time.perf_counter() - start:.1f} s, "
+              f"{os.cpu_count()} CPUs\n")
+
+        expected = Counter({kanji: count * copies for kanji, count in block_counts.items()})
+        print(f"{'Processes':<11}{'Time (s)':>10}{'MB/s':>8}  Counts")
+        failures = 0
+        for jobs in args.jobs:
+            counts, stats = count_kanji([path], jobs)
+            correct = counts == expected
+            failures += not correct
+            print(f"{stats['processes']:<11}{stats['seconds']:>10.1f}{size / stats['seconds']:>8.1f}  "
+                  f"{'match' if correct else '🔴 differ'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
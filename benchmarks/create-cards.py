@@ -0,0 +1,131 @@
+"""Compare ways of creating kanji notes for `kanji.py import-jpdb` (import_jpdb.create_cards()).
+
+- sequential: findNotes, page fetch and addNote one character at a time
+- staged: every existence check, then every page, then every note, each stage batched
+- pipeline: note_pipeline.create_notes(), the stages overlapping
+
+Anki is the in-process fake with a delay per request and per action, jpdb.io a fake
+session that answers every page after a fixed delay. The scraper runs without its
+rate limit, which would otherwise dominate every path alike.
+
+A last run checks that a note Anki refuses as a duplicate, here one another client
+added while the pages were fetched, costs only that note and not the rest of its
+batch; it exits 1 otherwise. Run from any directory, e.g. the repository root:
+
+    python benchmarks/create-cards.py [characters] [page delay in ms]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from anki_connect import AnkiConnect
+from fake_anki import FakeAnkiSession
+from fake_jpdb import FakeJPDBSession
+from fixtures import KRAD_INDEX
+from jpdb_scraper import JPDBScraper
+from kanjitoradical.krad_index import KradIndex
+from note_pipeline import create_notes
+
+ANKI_LATENCY = 0.002  # Seconds per request
+ANKI_ACTION_LATENCY = 0.003  # Seconds per action, a search or a note added
+EXISTING = 0.3  # Share of the characters that already have a note
+
+
+def make_note(character, details, page):
+    keyword, mnemonic = page or ["No keyword found", "No mnemonic found"]
+    return {"deckName": "Import Testing", "modelName": "Japanese Kanji",
+            "fields": {"Character": character, "Keyword": keyword, "Mnemonic": mnemonic,
+                       "Radicals": ", ".join(details["radicals"])},
+            "tags": ["import_testing", "kanji", details["tag"]]}
+
+
+def sequential(anki, scraper, data):
+    for character, details in data.items():
+        if anki.invoke("findNotes", query=f"Character:{character}"):
+            continue
+        anki.invoke("addNote", note=make_note(character, details, scraper.fetch('kanji', character)))
+
+
+def staged(anki, scraper, data):
+    existing = dict(zip(data, anki.invoke_all("findNotes", [{'query': f"Character:{character}"} for character in data])))
+    pages = scraper.fetch_all('kanji', [character for character in data if not existing[character]])
+    with anki.batch():
+        for character, details in data.items():
+            if not existing[character]:
+                anki.queue("addNote", note=make_note(character, details, pages[character]))
+
+
+def pipeline(anki, scraper, data):
+    create_notes(anki, scraper, data, make_note)
+
+
+def check_duplicates(kanji_data, characters):
+    """Return whether create_notes() adds every other note of a batch with a duplicate in it."""
+    session = FakeAnkiSession()
+    data = {character: {"radicals": kanji_data[character], "tag": "known"} for character in characters}
+    raced = characters[len(characters) // 2]
+
+    def racing_note(character, details, page):
+        if character == raced:
+            session.add_note(max(session.notes, default=0) + 1, "Japanese Kanji", {'Character': raced}, [])
+        return make_note(character, details, page)
+
+    with tempfile.TemporaryDirectory() as directory:
+        scraper = JPDBScraper(cache_path=os.path.join(directory, 'jpdb.sqlite'), requests_per_second=0,
+                              session=FakeJPDBSession(0))
+        stdout, sys.stdout = sys.stdout, open(os.devnull, 'w', encoding='utf-8')
+        try:
+            added, failed = create_notes(AnkiConnect(session=session), scraper, data, racing_note,
+                                         flush_interval=60)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        scraper.db.close()
+    return ([note['fields']['Character'] for note in failed] == [raced]
+            and len(added) == len(characters) - 1)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    page_delay = (int(sys.argv[2]) if len(sys.argv) > 2 else 80) / 1000
+    rng = random.Random(0)
+    kanji_data = KradIndex(KRAD_INDEX)
+    characters = rng.sample(sorted(kanji_data), count)
+    data = {character: {"radicals": kanji_data[character], "tag": "known"} for character in characters}
+    existing = set(rng.sample(characters, int(count * EXISTING)))
+
+    print(f"{count} kanji, {len(existing)} already in Anki, {page_delay * 1000:.0f} ms per page\n")
+    print(f"{'Path':<12}{'Time (s)':>10}{'Anki requests':>15}{'Pages':>7}{'Notes':>7}")
+    stdout = sys.stdout
+    for label, function in (('sequential', sequential), ('staged', staged), ('pipeline', pipeline)):
+        session = FakeAnkiSession(latency=ANKI_LATENCY, action_latency=ANKI_ACTION_LATENCY)
+        for note_id, character in enumerate(sorted(existing), 1):
+            session.add_note(note_id, "Japanese Kanji", {'Character': character}, ['known'])
+        notes = len(session.notes)
+        jpdb = FakeJPDBSession(page_delay)
+        with tempfile.TemporaryDirectory() as directory:
+            scraper = JPDBScraper(cache_path=os.path.join(directory, 'jpdb.sqlite'), requests_per_second=0,
+                                  session=jpdb)
+            start = time.perf_counter()
+            sys.stdout = open(os.devnull, 'w', encoding='utf-8')  # create_notes() prints every character
+            try:
+                function(AnkiConnect(session=session), scraper, data)
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+            elapsed = time.perf_counter() - start
+            scraper.db.close()
+        print(f"{label:<12}{elapsed:>10.2f}{session.requests:>15}{jpdb.requests:>7}{len(session.notes) - notes:>7}")
+
+    ok = check_duplicates(kanji_data, characters[:20])
+    print(f"\nA duplicate in a batch {'only fails its own note' if ok else '🔴 fails the whole batch'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Compare a cold `kanji.py update` run with a cycle of the resident --daemon mode.
+
+Both react to the same change, a few cards reviewed past the known interval, in a
+synthetic collection served by the in-process fake AnkiConnect. The cold run is a
+fresh interpreter that imports everything, opens the caches and loads the KRADFILE
+index before planning, like a cron job with the cache files left by earlier runs.
+Times leave out the time the fake spends answering, real runs add AnkiConnect's
+time and HTTP latency to both.
+Run from any directory, e.g. the repository root:
+
+    python benchmarks/daemon-latency.py [vocab notes]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+CHANGED_CARDS = 20
+# The fresh interpreter of the cold run finds the modules the same way
+CHILD_ENV = dict(os.environ, PYTHONPATH=os.pathsep.join([REPOSITORY, os.path.join(REPOSITORY, 'benchmarks')]))
+
+SETUP = """
+import os, sys, time
+from fixtures import CONFIG, KRAD_INDEX, make_collection
+from kanjitoradical.krad_index import KradIndex
+
+
+def review(session, count):
+    # Cards reviewed past the known interval since the last run
+    reviewed = [card for card in session.cards.values()
+                if 'new' in session.notes[card['note']]['tags'] and card['interval'] < 21][:count]
+    mod = session.touch()
+    for card in reviewed:
+        card['interval'], card['mod'] = 30, mod
+"""
+
+COLD = SETUP + """
+vocab_count, cache_path, checkpoint, changed = int(sys.argv[1]), sys.argv[2], sys.argv[3], int(sys.argv[4])
+session = make_collection(vocab_count)
+keywords = lambda characters: {character: ["keyword", "mnemonic"] for character in characters}
+
+start = time.perf_counter()
+from anki_cache import KnowledgeCache
+from anki_connect import AnkiConnect
+from jpdb_scraper import JPDBScraper
+from update_plan import apply_plan, build_plan, fetch_snapshot
+imported = time.perf_counter()
+
+
+def run():
+    # Everything a fresh cron process sets up, with the cache file left by earlier runs
+    anki = AnkiConnect(session=session)
+    cache = KnowledgeCache(anki, cache_path)
+    kanji_data = KradIndex(KRAD_INDEX)
+    snapshot = fetch_snapshot(anki, cache, CONFIG)
+    apply_plan(anki, build_plan(snapshot, kanji_data, keywords, CONFIG), checkpoint)
+    cache.db.close()
+
+
+run()  # Earlier cron runs: the collection is settled and the cache file filled
+review(session, changed)
+requests, server_time = session.requests, session.server_time
+run_start = time.perf_counter()
+run()
+print(imported - start, time.perf_counter() - run_start - (session.server_time - server_time),
+      session.requests - requests)
+"""
+
+
+def interpreter_startup():
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    vocab_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    namespace = {}
+    exec(SETUP, namespace)
+    from anki_cache import KnowledgeCache
+    from anki_connect import AnkiConnect
+    from update_daemon import UpdateDaemon
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, 'cache.sqlite')
+        checkpoint = os.path.join(directory, 'checkpoint.json')
+
+        # Cold: a fresh interpreter, as started by cron
+        output = subprocess.run([sys.executable, '-c', COLD, str(vocab_count), cache_path, checkpoint,
+                                 str(CHANGED_CARDS)], check=True, capture_output=True, text=True, env=CHILD_ENV).stdout
+        import_time, cold_run, cold_requests = map(float, output.split())
+        startup = interpreter_startup()
+
+        # Daemon: one resident process, warmed up by its first cycle
+        session = namespace['make_collection'](vocab_count)
+        anki = AnkiConnect(session=session)
+        cache = KnowledgeCache(anki, os.path.join(directory, 'daemon.sqlite'))
+        keywords = lambda characters: {character: ["keyword", "mnemonic"] for character in characters}
+        daemon = UpdateDaemon(anki, cache, namespace['KradIndex'](namespace['KRAD_INDEX']), keywords,
+                              namespace['CONFIG'], checkpoint)
+        daemon.cycle()
+
+        timings = {}
+        for label, change in (('daemon, no change', False), ('daemon, change', True)):
+            if change:
+                namespace['review'](session, CHANGED_CARDS)
+            requests, server_time = session.requests, session.server_time
+            start = time.perf_counter()
+            plans = daemon.cycle()
+            elapsed = time.perf_counter() - start - (session.server_time - server_time)
+            timings[label] = (elapsed, session.requests - requests, plans)
+
+    print(f"{vocab_count} vocab notes, {len(session.cards)} cards, {CHANGED_CARDS} cards reviewed\n")
+    print(f"{'':<28}{'Time (ms)':>10}{'Requests':>10}")
+    print(f"{'cold: interpreter start':<28}{startup * 1000:>10.1f}")
+    print(f"{'cold: imports':<28}{import_time * 1000:>10.1f}")
+    print(f"{'cold: load and run':<28}{cold_run * 1000:>10.1f}{cold_requests:>10.0f}")
+    print(f"{'cold total':<28}{(startup + import_time + cold_run) * 1000:>10.1f}")
+    for label, (elapsed, requests, plans) in timings.items():
+        actions = f"{len(plans)} plans, {sum(len(plan['actions']) for plan in plans)} actions" if plans else 'skipped'
+        print(f"{label:<28}{elapsed * 1000:>10.1f}{requests:>10}  {actions}")
+    for plan in timings['daemon, change'][2]:
+        print(json.dumps(plan['summary'], ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Run the scripts' own code against a synthetic collection and report every phase.
+
+The update, jlpt-check and study-priority commands of kanji.py run with their
+AnkiConnect client pointed at the fake AnkiConnect, in process or through a
+localhost HTTP server with --http. Their jpdb.io scraper gets a fake session. Each
+phase reports the AnkiConnect requests it made, its wall time and the part of it
+the fake spent answering, and its peak Python memory as seen by tracemalloc. Wall
+times include tracemalloc's overhead unless --no-memory is given.
+
+The commands run in a scratch directory, so their caches, checkpoint and
+missing-vocab files never touch the real ones. import-jpdb needs a reviews.json
+export and is not covered here, benchmarks/create-cards.py measures its card
+creation.
+Run from any directory, e.g. the repository root:
+
+    python benchmarks/end-to-end.py [--vocab 50000] [--http] [--no-memory]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+import jlpt_check
+import study_priority
+import update_cards
+from anki_cache import KnowledgeCache
+from anki_connect import AnkiConnect
+from fake_jpdb import FakeJPDBSession
+from fixtures import make_collection
+from kanjitoradical.krad_index import load_kanji_data
+from update_plan import apply_plan, build_plan, fetch_snapshot
+
+SHARED = ['jlpt-vocab', 'kanjitoradical']  # Read-only data the commands open by relative path
+
+
+class Phases:
+    def __init__(self, session, memory):
+        self.session = session
+        self.memory = memory
+        self.rows = []
+
+    def run(self, script, phase, function, *args):
+        requests, server_time = self.session.requests, self.session.server_time
+        if self.memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function(*args)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - before if self.memory else None
+        self.rows.append((script, phase, self.session.requests - requests, elapsed,
+                          self.session.server_time - server_time, peak))
+        return result
+
+    def print(self):
+        print(f"{'Script':<21}{'Phase':<18}{'Requests':>9}{'Time (ms)':>11}{'Anki (ms)':>11}{'Peak (MB)':>11}")
+        for script, phase, requests, elapsed, server_time, peak in self.rows:
+            memory = f"{peak / 2 ** 20:>11.1f}" if peak is not None else f"{'-':>11}"
+            print(f"{script:<21}{phase:<18}{requests:>9}{elapsed * 1000:>11.1f}{server_time * 1000:>11.1f}{memory}")
+
+
+def update(phases, clients, run):
+    script = f"update {run}"
+    snapshot = phases.run(script, "snapshot", fetch_snapshot, clients.anki, clients.cache, update_cards.CONFIG)
+    kanji_data = phases.run(script, "load KRADFILE", load_kanji_data)
+    closure = phases.run(script, "load closure", update_cards.load_closure, kanji_data, update_cards.CONFIG)
+    plan = phases.run(script, "plan", build_plan, snapshot, kanji_data,
+                      clients.get_keywords_and_mnemonics, update_cards.CONFIG, closure)
+    phases.run(script, "apply", apply_plan, clients.anki, plan, update_cards.CHECKPOINT_FILE)
+    return plan
+
+
+def jlpt_check_levels(phases, anki, cache):
+    known_cards = phases.run("jlpt-check", "known notes", jlpt_check.get_known_cards, anki, cache)
+    phases.run("jlpt-check", "check levels", jlpt_check.check_jlpt_levels, jlpt_check.JLPT_LEVELS, known_cards)
+
+
+def study_priorities(phases, anki, cache):
+    module = study_priority
+    known = phases.run("study-priority", "known characters", module.get_known_characters, anki, cache)
+    kanji_index = phases.run("study-priority", "kanji index", module.build_index, anki, cache,
+                             module.KANJI_NOTE_TYPE, 'Radicals', known)
+    vocab_index = phases.run("study-priority", "vocab index", module.build_index, anki, cache,
+                             module.VOCAB_NOTE_TYPE, 'Kanji', known)
+    phases.run("study-priority", "rank", lambda: (kanji_index.rank(module.TOP_N), vocab_index.rank(module.TOP_N)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of the scripts against a fake AnkiConnect.")
+    parser.add_argument('--vocab', type=int, default=50000, help="vocab notes in the synthetic collection")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--http', action='store_true', help="go through a localhost HTTP server")
+    parser.add_argument('--no-memory', action='store_true', help="time the phases without tracemalloc")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    session = make_collection(args.vocab, args.seed)
+    print(f"{len(session.notes)} notes, {len(session.cards)} cards, generated in "
+          f"{time.perf_counter() - start:.1f} s ({'HTTP' if args.http else 'in process'})\n")
+    server = None
+    if args.http:
+        from fake_anki import serve
+        server = serve(session, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    directory = tempfile.mkdtemp()
+    for name in SHARED:
+        os.symlink(os.path.join(REPOSITORY, name), os.path.join(directory, name))
+    os.chdir(directory)
+    clients = update_cards.Clients()
+    anki = AnkiConnect()
+    cache = KnowledgeCache(anki, jlpt_check.ANKI_CACHE)
+    for client in (clients.anki, anki):
+        if server:
+            client.url = f"http://localhost:{server.server_address[1]}"
+        else:
+            client.session = session
+    clients.scraper.session = FakeJPDBSession()
+    clients.scraper.rate_limiter.interval = 0.0
+
+    if not args.no_memory:
+        tracemalloc.start()
+    phases = Phases(session, not args.no_memory)
+    update(phases, clients, "(cold)")
+    update(phases, clients, "(warm)")
+    jlpt_check_levels(phases, anki, cache)
+    study_priorities(phases, anki, cache)
+    phases.print()
+    print("\nRequests by action: " + ", ".join(f"{action} {count}" for action, count in sorted(session.actions.items())))
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Stand-in for AnkiConnect, used by the benchmarks.
+
+FakeAnkiSession can be passed as the `session` of an AnkiConnect client. It keeps
+a collection in memory and counts the requests and bytes it receives, and
+the time spent answering them so it can be told apart from the client's own.
+`latency` (per request) and `action_latency` (per action, also inside `multi`)
+make it answer as slowly as a real Anki would.
+
+serve() puts a session behind a localhost HTTP server, so the scripts themselves
+can run against a synthetic collection. From the repository root:
+
+    python benchmarks/fake_anki.py [--vocab 20000] [--port 8765]
+
+The scripts then talk to it instead of Anki, though `kanji.py update` still fetches
+jpdb.io pages for the kanji it creates. Move `.anki-cache.sqlite` aside first, or
+the fake notes end up in the cache of the real collection.
+"""
+import argparse
+import json
+import operator
+import os
+import re
+import shlex
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROP_OPERATORS = {'<': operator.lt, '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+                  '=': operator.eq, '!=': operator.ne}
+
+
+class FakeRequest:
+    def __init__(self, body):
+        self.body = body
+
+
+class FakeResponse:
+    def __init__(self, data, request_body=b''):
+        self.data = data
+        self.request = FakeRequest(request_body)
+        self.content = _dumps(data)  # What the real server would send, for payload accounting
+        self.headers = {'Content-Length': str(len(self.content))}
+
+    def json(self):
+        return self.data
+
+
+class FakeAnkiSession:
+    def __init__(self, latency=0.0, action_latency=0.0):
+        self.latency = latency
+        self.action_latency = action_latency
+        self.notes = {}
+        self.cards = {}
+        self.requests = 0
+        self.request_bytes = 0
+        self.actions = {}
+        self.server_time = 0.0
+        self.clock = 1  # mod time given to everything that changes
+        self.first_fields = set()  # (note type, first field value), what Anki checks for duplicates
+
+    def add_note(self, note_id, model_name, fields, tags, card_count=1, interval=0, deck_name="Default"):
+        self.first_fields.add((model_name, next(iter(fields.values()), None)))
+        card_ids = [note_id * 10 + i for i in range(card_count)]
+        self.notes[note_id] = {'noteId': note_id, 'modelName': model_name, 'tags': list(tags), 'mod': self.clock,
+                               'fields': {name: {'value': value, 'order': i} for i, (name, value) in enumerate(fields.items())},
+                               'cards': card_ids}
+        for card_id in card_ids:
+            self.cards[card_id] = {'cardId': card_id, 'note': note_id, 'interval': interval, 'mod': self.clock,
+                                   'modelName': model_name, 'deckName': deck_name, 'suspended': False}
+        return card_ids
+
+    def touch(self):
+        self.clock += 1
+        return self.clock
+
+    def post(self, url, json=None):
+        start = time.perf_counter()
+        self.requests += 1
+        body = _dumps(json)
+        self.request_bytes += len(body)
+        time.sleep(self.latency)
+        response = FakeResponse(self._dispatch(json['action'], json.get('params', {})), body)
+        self.server_time += time.perf_counter() - start
+        return response
+
+    def _dispatch(self, action, params):
+        self.actions[action] = self.actions.get(action, 0) + 1
+        if action != 'multi':
+            time.sleep(self.action_latency)
+        try:
+            return {'result': getattr(self, f'_{action}')(**params), 'error': None}
+        except Exception as e:
+            return {'result': None, 'error': str(e)}
+
+    def _multi(self, actions):
+        return [self._dispatch(action['action'], action.get('params', {})) for action in actions]
+
+    def _matches(self, note, card, term):
+        if term.startswith('-'):
+            return not self._matches(note, card, term[1:])
+        key, _, value = term.partition(':')
+        if key == 'nid':
+            return note['noteId'] in {int(nid) for nid in value.split(',')}
+        if key == 'tag':
+            return value in note['tags']
+        if key == 'note':
+            return note['modelName'] == value
+        if key == 'deck':
+            return card['deckName'] == value
+        if key == 'is' and value == 'suspended':
+            return card['suspended']
+        if key == 'prop' and value.startswith('ivl'):
+            comparison, days = re.fullmatch(r'ivl(<=|>=|!=|<|>|=)(\d+)', value).groups()
+            return PROP_OPERATORS[comparison](card['interval'], int(days))
+        if key[:1].isupper():
+            # Field search, the scripts' field names are capitalized; it matches the whole field
+            return key in note['fields'] and note['fields'][key]['value'] == value
+        raise ValueError(f"unsupported search term {term}")
+
+    def _search(self, query):
+        """Return the ids of the cards matching query."""
+        # Disjunction of conjunctions, enough for the searches the scripts build
+        clauses = [[]]
+        for token in shlex.split(query):
+            if token.lower() == 'or':
+                clauses.append([])
+            else:
+                clauses[-1].append(token)
+        # Single nid and field clauses are looked up directly so huge OR searches stay cheap here
+        note_ids = set()
+        field_values = {}
+        general = []
+        for clause in clauses:
+            key, _, value = clause[0].partition(':') if len(clause) == 1 else ('', '', '')
+            if key == 'nid':
+                note_ids.update(int(nid) for nid in value.split(','))
+            elif key[:1].isupper() and value:
+                field_values.setdefault(key, set()).add(value)
+            else:
+                general.append(clause)
+        matches = []
+        for card in self.cards.values():
+            note = self.notes[card['note']]
+            if (note['noteId'] in note_ids
+                    or field_values and any(note['fields'][name]['value'] in values
+                                            for name, values in field_values.items() if name in note['fields'])
+                    or general and any(all(self._matches(note, card, term) for term in clause) for clause in general)):
+                matches.append(card['cardId'])
+        return matches
+
+    def _version(self):
+        return 6
+
+    def _findNotes(self, query):
+        return list(dict.fromkeys(self.cards[card_id]['note'] for card_id in self._search(query)))
+
+    def _findCards(self, query):
+        return self._search(query)
+
+    def _notesInfo(self, notes):
+        return [self.notes.get(note_id, {}) for note_id in notes]
+
+    def _cardsInfo(self, cards):
+        return [dict({key: value for key, value in self.cards[card_id].items() if key != 'suspended'},
+                     fields=self.notes[self.cards[card_id]['note']]['fields'])
+                for card_id in cards if card_id in self.cards]
+
+    def _getIntervals(self, cards, complete=False):
+        if complete:
+            return [[self.cards[card_id]['interval']] for card_id in cards]
+        return [self.cards[card_id]['interval'] for card_id in cards]
+
+    def _areSuspended(self, cards):
+        return [self.cards[card_id]['suspended'] if card_id in self.cards else None for card_id in cards]
+
+    def _notesModTime(self, notes):
+        return [{'noteId': note_id, 'mod': self.notes[note_id]['mod']} for note_id in notes if note_id in self.notes]
+
+    def _cardsModTime(self, cards):
+        return [{'cardId': card_id, 'mod': self.cards[card_id]['mod']} for card_id in cards if card_id in self.cards]
+
+    def _updateNoteFields(self, note):
+        stored = self.notes[note['id']]
+        for name, value in note['fields'].items():
+            stored['fields'][name]['value'] = value
+        stored['mod'] = self.touch()
+
+    def _edit_tags(self, notes, edit):
+        mod = self.touch()
+        for note_id in notes:
+            note = self.notes[note_id]
+            note['tags'] = edit(note['tags'])
+            note['mod'] = mod
+
+    def _addTags(self, notes, tags):
+        self._edit_tags(notes, lambda current: current + [tag for tag in tags.split() if tag not in current])
+
+    def _removeTags(self, notes, tags):
+        self._edit_tags(notes, lambda current: [tag for tag in current if tag not in tags.split()])
+
+    def _replaceTags(self, notes, tag_to_replace, replace_with_tag):
+        self._edit_tags(notes, lambda current: list(dict.fromkeys(
+            replace_with_tag if tag == tag_to_replace else tag for tag in current)))
+
+    def _set_suspended(self, cards, suspended):
+        mod = self.touch()
+        changed = False
+        for card_id in cards:
+            card = self.cards[card_id]
+            if card['suspended'] != suspended:
+                card['suspended'] = suspended
+                card['mod'] = mod
+                changed = True
+        return changed
+
+    def _suspend(self, cards):
+        return self._set_suspended(cards, True)
+
+    def _unsuspend(self, cards):
+        return self._set_suspended(cards, False)
+
+    def _addNote(self, note):
+        if (note['modelName'], next(iter(note['fields'].values()), None)) in self.first_fields:
+            raise ValueError("cannot create note because it is a duplicate")
+        note_id = max(self.notes, default=0) + 1
+        self.touch()
+        self.add_note(note_id, note['modelName'], note['fields'], note.get('tags', []), deck_name=note['deckName'])
+        return note_id
+
+    def _addNotes(self, notes):
+        time.sleep(self.action_latency * (len(notes) - 1))  # Anki still adds them one by one
+        return [self._addNote(note) for note in notes]
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the requests.Session of the scripts
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with self.server.lock:
+            body = self.server.session.post(self.path, json=request).content
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(session, host='localhost', port=8765):
+    """Return an HTTPServer answering AnkiConnect requests from session, call serve_forever() on it.
+
+    Connections are kept open side by side, but like Anki it answers one request
+    at a time. Port 0 picks a free port, see server_address.
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.session = session
+    server.lock = threading.Lock()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic collection over the AnkiConnect protocol.")
+    parser.add_argument('--vocab', type=int, default=20000, help="vocab notes in the collection")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="extra milliseconds per request")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Run as a script
+    from fixtures import make_collection
+    session = make_collection(args.vocab, args.seed, latency=args.latency / 1000)
+    server = serve(session, port=args.port)
+    print(f"🟢 {len(session.notes)} notes and {len(session.cards)} cards on http://localhost:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{session.requests} requests: " + ", ".join(f"{action} {count}" for action, count in
+                                                             sorted(session.actions.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Stand-in for the requests session of JPDBScraper, used by the benchmarks.
+
+Every page is a kanji page with a keyword and a mnemonic, answered after `delay`
+seconds, so no benchmark ever reaches jpdb.io.
+"""
+import time
+
+PAGE = """<html><body><h6>Keyword</h6><div>{keyword}</div>
+<div class="mnemonic">A <b>mnemonic</b> for {keyword}</div></body></html>"""
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+        self.headers = {'Content-Length': str(len(text.encode('utf-8')))}
+
+
+class FakeJPDBSession:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = 0
+
+    def get(self, url, timeout=None):
+        self.requests += 1
+        time.sleep(self.delay)
+        return FakeResponse(PAGE.format(keyword=url.rsplit('/', 1)[-1]))
@@ -0,0 +1,99 @@
+"""Synthetic collections shared by the benchmarks.
+
+make_snapshot() builds a fetch_snapshot()-shaped dict from the JLPT word lists and
+the KRADFILE, so its shape matches a real collection. populate() loads such a
+snapshot into a FakeAnkiSession, make_collection() does both. The data paths
+are absolute, so the benchmarks run from any directory.
+"""
+import csv
+import os
+import random
+
+import jlpt_coverage
+import jlpt_store
+from fake_anki import FakeAnkiSession
+from japanese_text import extract_kanji
+from jlpt_coverage import JLPT_LEVELS
+from kanjitoradical import krad_closure, krad_index
+from kanjitoradical.krad_index import KradIndex
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KRAD_INDEX = os.path.join(REPOSITORY, krad_index.KRAD_INDEX)
+KRAD_CLOSURE = os.path.join(REPOSITORY, krad_closure.KRAD_CLOSURE)
+JLPT_VOCAB_DIR = os.path.join(REPOSITORY, jlpt_coverage.JLPT_VOCAB_DIR)
+JLPT_STORE = os.path.join(REPOSITORY, jlpt_store.JLPT_STORE)
+CONFIG = {
+    'kanji_deck': "Kanji and Radicals",
+    'vocab_note_type': "yomitan Japanese",
+    'kanji_note_type': "Japanese Kanji",
+    'radical_note_type': "Japanese Radicals",
+    'layers': {"Japanese Kanji": 'Radicals', "yomitan Japanese": 'Kanji'},
+}
+
+
+def make_snapshot(vocab_count, kanji_data, seed=0):
+    rng = random.Random(seed)
+    words = []
+    for level in JLPT_LEVELS:
+        with open(os.path.join(JLPT_VOCAB_DIR, f"{level}.csv"), 'r', encoding='utf-8') as file:
+            words += [row['kanji'] or row['kana'] for row in csv.DictReader(file)]
+    words = [rng.choice(words) for _ in range(vocab_count)]
+
+    cards, tags = [], {'new': [], 'known': [], 'locked': []}
+    missing_kanji_notes = []
+    next_id = 1
+
+    def add(model, fields, tag, interval):
+        nonlocal next_id
+        card_id, next_id = next_id, next_id + 1
+        if tag == 'locked':
+            interval = 0  # Locked cards are suspended before they are ever studied
+        cards.append({'cardId': card_id, 'note': card_id, 'modelName': model, 'interval': interval,
+                      'fields': {name: {'value': value} for name, value in fields.items()}})
+        tags[tag].append(card_id)
+        return card_id
+
+    characters = {kanji for word in words for kanji in extract_kanji(word)}
+    deck_characters = set()
+    for kanji in sorted(characters):
+        if rng.random() < 0.2:
+            continue  # Not in the deck yet, the planner has to create it
+        radicals = [radical for radical in kanji_data.get(kanji, []) if radical != kanji]
+        for radical in radicals:
+            if radical not in deck_characters:
+                add(CONFIG['radical_note_type'], {'Character': radical}, rng.choice(['new', 'known']), rng.choice([0, 10, 30]))
+                deck_characters.add(radical)
+        add(CONFIG['kanji_note_type'], {'Character': kanji, 'Radicals': ", ".join(radicals)},
+            rng.choice(['new', 'known', 'locked']), rng.choice([0, 10, 30]))
+        deck_characters.add(kanji)
+
+    for word in words:
+        if rng.random() < 0.3:
+            card_id = add(CONFIG['vocab_note_type'], {'Expression': word, 'Kanji': ''}, 'locked', 0)
+            missing_kanji_notes.append({'noteId': card_id, 'tags': ['locked'], 'cards': [card_id],
+                                        'fields': {'Expression': {'value': word}}})
+        else:
+            add(CONFIG['vocab_note_type'], {'Expression': word, 'Kanji': ", ".join(extract_kanji(word))},
+                rng.choice(['new', 'known', 'locked']), rng.choice([0, 10, 30]))
+
+    return {'missing_kanji_notes': missing_kanji_notes, 'deck_characters': sorted(deck_characters),
+            'cards': cards, **tags}
+
+
+def populate(session, snapshot, config=CONFIG):
+    """Add the notes of a make_snapshot() snapshot to a FakeAnkiSession."""
+    tags = {card_id: tag for tag in ('new', 'known', 'locked') for card_id in snapshot[tag]}
+    for card in snapshot['cards']:
+        model = card['modelName']
+        deck = config['kanji_deck'] if model != config['vocab_note_type'] else "Vocab"
+        session.add_note(card['note'], model, {name: field['value'] for name, field in card['fields'].items()},
+                         [tags[card['cardId']]], interval=card['interval'], deck_name=deck)
+        # add_note numbers cards note_id * 10, the snapshot ids refer to notes
+        session.cards[card['note'] * 10]['suspended'] = tags[card['cardId']] == 'locked'
+
+
+def make_collection(vocab_count, seed=0, **options):
+    """Return a FakeAnkiSession holding a synthetic collection with vocab_count vocab notes."""
+    session = FakeAnkiSession(**options)
+    populate(session, make_snapshot(vocab_count, KradIndex(KRAD_INDEX), seed))
+    return session
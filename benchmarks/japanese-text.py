@@ -0,0 +1,130 @@
+"""Check japanese_text against the `regex` module and compare their speed.
+
+Every codepoint is classified by both, then kanji extraction and stripping are
+compared line by line over the KRADFILE sources and the JLPT vocabulary lists.
+Needs `regex`, which the scripts themselves no longer use: `pip install -r
+benchmarks/requirements.txt`.
+Run from any directory, e.g. the repository root:
+
+    python benchmarks/japanese-text.py             # verify and time
+    python benchmarks/japanese-text.py --generate  # print the range tables
+"""
+import glob
+import os
+import subprocess
+import sys
+import time
+
+import regex
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from japanese_text import (HAN, HIRAGANA, KATAKANA, extract_kanji, extract_kanji_batch, script,
+                           strip_non_japanese, strip_non_japanese_batch, strip_non_kanji)
+
+# Relative to the repository, as printed
+CORPORA = ["kanjitoradical/kradfile", "kanjitoradical/kradfile2", "kanjitoradical/kradfile-combined",
+           "kanjitoradical/kradfile-combined.json"] + sorted(
+    os.path.relpath(path, REPOSITORY) for path in glob.glob(os.path.join(REPOSITORY, "jlpt-vocab", "*.csv")))
+SCRIPTS = {HAN: 'Han', HIRAGANA: 'Hiragana', KATAKANA: 'Katakana'}
+REGEX_KANJI = regex.compile(r'\p{Han}')
+REGEX_NON_JAPANESE = regex.compile(r'[^\p{Hiragana}\p{Katakana}\p{Han}]')
+REPEAT = 5
+CHILD_ENV = dict(os.environ, PYTHONPATH=REPOSITORY)  # Imports are timed in a fresh interpreter
+
+
+def codepoints():
+    return (chr(code) for code in range(0x110000) if not 0xD800 <= code <= 0xDFFF)
+
+
+def script_ranges(name):
+    pattern = regex.compile(rf'\p{{{name}}}')
+    ranges = []
+    for char in codepoints():
+        if pattern.match(char):
+            code = ord(char)
+            if ranges and ranges[-1][1] == code - 1:
+                ranges[-1][1] = code
+            else:
+                ranges.append([code, code])
+    return ranges
+
+
+def generate():
+    for constant, name in (('HAN_RANGES', 'Han'), ('HIRAGANA_RANGES', 'Hiragana'), ('KATAKANA_RANGES', 'Katakana')):
+        ranges = [f"(0x{first:X}, 0x{last:X})" for first, last in script_ranges(name)]
+        print(f"{constant} = (")
+        for i in range(0, len(ranges), 5):
+            print(f"    {', '.join(ranges[i:i + 5])},")
+        print(")")
+
+
+def verify_codepoints():
+    patterns = {ours: regex.compile(rf'\p{{{name}}}') for ours, name in SCRIPTS.items()}
+    mismatches = [char for char in codepoints()
+                  if script(char) != next((ours for ours, pattern in patterns.items() if pattern.match(char)), None)]
+    print(f"{'codepoints':<40}{len(mismatches)} mismatches")
+    return not mismatches
+
+
+def verify_corpus(path, lines):
+    expected_kanji = [REGEX_KANJI.findall(line) for line in lines]
+    expected_stripped = [REGEX_NON_JAPANESE.sub('', line) for line in lines]
+    mismatches = sum(
+        kanji != expected or batch_kanji != expected or only_kanji != ''.join(expected)
+        or stripped != expected_strip or batch_stripped != expected_strip
+        for kanji, batch_kanji, only_kanji, stripped, batch_stripped, expected, expected_strip in zip(
+            map(extract_kanji, lines), extract_kanji_batch(lines), map(strip_non_kanji, lines),
+            map(strip_non_japanese, lines), strip_non_japanese_batch(lines), expected_kanji, expected_stripped))
+    print(f"{path:<40}{len(lines):>8} lines  {mismatches} mismatches")
+    return not mismatches
+
+
+def timed(label, function, lines):
+    best = min(_time(function, lines) for _ in range(REPEAT))
+    print(f"{label:<40}{best * 1000:>8.1f} ms")
+
+
+def _time(function, lines):
+    start = time.perf_counter()
+    function(lines)
+    return time.perf_counter() - start
+
+
+def import_time(module):
+    command = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    return min(float(subprocess.run([sys.executable, '-c', command], capture_output=True, text=True,
+                                    check=True, env=CHILD_ENV).stdout) for _ in range(REPEAT))
+
+
+def main():
+    if '--generate' in sys.argv:
+        generate()
+        return
+
+    ok = verify_codepoints()
+    corpus = []
+    for path in CORPORA:
+        with open(os.path.join(REPOSITORY, path), 'r', encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        ok = verify_corpus(path, lines) and ok
+        corpus.extend(lines)
+
+    print(f"\n{len(corpus)} lines, {sum(map(len, corpus))} characters")
+    timed("regex \\p{Han} findall", lambda lines: [REGEX_KANJI.findall(line) for line in lines], corpus)
+    timed("extract_kanji", lambda lines: [extract_kanji(line) for line in lines], corpus)
+    timed("extract_kanji_batch", extract_kanji_batch, corpus)
+    timed("strip_non_kanji", lambda lines: [strip_non_kanji(line) for line in lines], corpus)
+    timed("regex strip", lambda lines: [REGEX_NON_JAPANESE.sub('', line) for line in lines], corpus)
+    timed("strip_non_japanese", lambda lines: [strip_non_japanese(line) for line in lines], corpus)
+    timed("strip_non_japanese_batch", strip_non_japanese_batch, corpus)
+
+    print()
+    for module in ('regex', 'japanese_text'):
+        print(f"{'import ' + module:<40}{import_time(module) * 1000:>8.1f} ms")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Compare the per-level exact JLPT check with the single-pass, variant-aware
+coverage engine, and the CSV load plus folding with loading the prebuilt JLPT store.
+
+Known notes are synthesised from the JLPT lists plus filler words, so no Anki is
+needed. Some JLPT words are stored as variants (katakana reading, furigana markup)
+that only the canonical keys match. Before timing, canonical_keys() is checked
+against canonical_key() and against a few variants with known keys, half-width
+kana with voiced and semi-voiced marks among them. Run from any directory, e.g.
+the repository root:
+
+    python benchmarks/jlpt-coverage.py [known notes]
+"""
+import csv
+import os
+import random
+import sys
+import time
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from anki_cache import NoteRecord
+from fixtures import JLPT_STORE, JLPT_VOCAB_DIR
+from jlpt_coverage import (JLPT_LEVELS, build_known_index, canonical_key, canonical_keys, coverage,
+                           known_flags, load_jlpt_vocab, normalize_japanese)
+from jlpt_store import load_store
+
+# (text, reading, canonical key)
+FOLDING_CASES = [
+    ('ｶﾞｯｺｳ', False, 'がっこう'),
+    ('ﾊﾟﾝ', False, 'ぱん'),
+    ('ﾎﾟｹｯﾄ', False, 'ぽけっと'),
+    ('ﾋﾞｰﾙ', False, 'びる'),
+    ('ガッコウ', False, 'がっこう'),
+    ('学校[がっこう]', False, '学校'),
+    ('学校[ｶﾞｯｺｳ]', True, 'がっこう'),
+    ('<b>ﾊﾟﾝ</b> ', False, 'ぱん'),
+]
+
+
+def check_folding(texts):
+    """Return the texts whose batch and single canonical keys differ, and the FOLDING_CASES folded wrong."""
+    mismatches = []
+    for reading in (False, True):
+        mismatches += [text for text, key in zip(texts, canonical_keys(texts, reading))
+                       if key != canonical_key(text, reading)]
+    for text, reading, expected in FOLDING_CASES:
+        if canonical_key(text, reading) != expected or canonical_keys([text], reading) != [expected]:
+            mismatches.append(text)
+    return mismatches
+
+
+def per_level_check(known_notes):
+    """The original implementation: reload the CSV and renormalize every note for each level."""
+    results = {}
+    for level in JLPT_LEVELS:
+        with open(os.path.join(JLPT_VOCAB_DIR, f"{level}.csv"), 'r', encoding='utf-8') as file:
+            jlpt_vocab = [{'kanji': row['kanji'], 'kana': row['kana']} for row in csv.DictReader(file)]
+        known_expressions = set()
+        known_readings = set()
+        for note in known_notes:
+            expression, reading = note.values
+            if expression is not None:
+                known_expressions.add(normalize_japanese(expression))
+                known_expressions.add(expression)
+                if reading is not None:
+                    known_readings.add(normalize_japanese(reading))
+                    known_readings.add(reading)
+        known = 0
+        for word in jlpt_vocab:
+            normalized_kanji = normalize_japanese(word['kanji']) if word['kanji'] else ""
+            normalized_kana = normalize_japanese(word['kana'])
+            if normalized_kanji and (normalized_kanji in known_expressions or word['kanji'] in known_expressions):
+                known += 1
+            elif (normalized_kana in known_expressions or normalized_kana in known_readings
+                  or word['kana'] in known_expressions or word['kana'] in known_readings):
+                known += 1
+        results[level] = known
+    return results
+
+
+def single_pass_check(known_notes):
+    vocab = load_jlpt_vocab(vocab_dir=JLPT_VOCAB_DIR)
+    flags = known_flags(vocab, build_known_index(known_notes))
+    return {level: len(known) for level, (known, _) in coverage(vocab, flags).items()}
+
+
+def store_check(known_notes):
+    vocab = load_store(JLPT_STORE, vocab_dir=JLPT_VOCAB_DIR)
+    flags = known_flags(vocab, build_known_index(known_notes))
+    return {level: len(known) for level, (known, _) in coverage(vocab, flags).items()}
+
+
+def csv_load():
+    vocab = load_jlpt_vocab(vocab_dir=JLPT_VOCAB_DIR)
+    return canonical_keys(vocab['kanji'] + vocab['kana'])
+
+
+def store_load():
+    vocab = load_store(JLPT_STORE, vocab_dir=JLPT_VOCAB_DIR)
+    return vocab['canonical_kanji'] + vocab['canonical_kana']
+
+
+def to_katakana(text):
+    return ''.join(chr(ord(char) + 0x60) if 'ぁ' <= char <= 'ゖ' else char for char in text)
+
+
+def make_known_notes(count, seed=0):
+    rng = random.Random(seed)
+    vocab = load_jlpt_vocab(vocab_dir=JLPT_VOCAB_DIR)
+    notes = []
+    for note_id in range(count):
+        if rng.random() < 0.5:
+            i = rng.randrange(len(vocab['kana']))
+            expression, reading = vocab['kanji'][i] or vocab['kana'][i], vocab['kana'][i]
+            variant = rng.random()
+            if variant < 0.1:
+                expression = reading = to_katakana(reading)
+            elif variant < 0.2 and vocab['kanji'][i]:
+                expression, reading = f"{vocab['kanji'][i]}[{vocab['kana'][i]}]", ""
+        else:
+            expression = ''.join(chr(rng.randrange(0x4E00, 0x9FA0)) for _ in range(rng.randrange(1, 4)))
+            reading = ''.join(chr(rng.randrange(0x3041, 0x3097)) for _ in range(rng.randrange(2, 6)))
+        notes.append(NoteRecord(note_id, 0, "yomitan Japanese", ('known',), (), (f"{expression}<br>", reading)))
+    return notes
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    known_notes = make_known_notes(count)
+    print(f"{count} known notes")
+    vocab = load_jlpt_vocab(vocab_dir=JLPT_VOCAB_DIR)
+    mismatches = check_folding(vocab['kanji'] + vocab['kana'] + [text for text, _, _ in FOLDING_CASES])
+    if mismatches:
+        print(f"🔴 {len(mismatches)} texts fold differently: {mismatches[:10]}")
+        sys.exit(1)
+    load_store(JLPT_STORE, vocab_dir=JLPT_VOCAB_DIR)  # Build the store up front so its one-off cost is not timed
+    for label, check in (('per level exact', per_level_check), ('single pass', single_pass_check),
+                         ('store', store_check)):
+        start = time.perf_counter()
+        result = check(known_notes)
+        print(f"{label:<16}{(time.perf_counter() - start) * 1000:>10.1f} ms  {result}")
+
+    print(f"\nLoading JLPT vocab ({os.path.relpath(JLPT_STORE, REPOSITORY)})")
+    for label, load in (('csv+fold', csv_load), ('store', store_load)):
+        start = time.perf_counter()
+        load()
+        print(f"{label:<16}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Check jpdb_pages against full BeautifulSoup parses and compare their speed.
+
+Every saved page in benchmarks/jpdb-pages/ is parsed by both, then a few thousand
+pages cut down from them at random (truncated, with spans of markup dropped) check
+the odd cases: unclosed elements, headings without a div after them, and so on.
+Run from any directory, e.g. the repository root:
+
+    python benchmarks/jpdb-pages.py [fuzzed pages]
+"""
+import glob
+import os
+import random
+import sys
+import time
+
+from bs4 import BeautifulSoup
+from bs4.exceptions import ParserRejectedMarkup
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from jpdb_pages import parse_kanji_page, parse_search_page
+
+PAGES = os.path.join(os.path.dirname(__file__), 'jpdb-pages')
+REPEAT = 20
+
+
+def reference_kanji_page(html):
+    soup = BeautifulSoup(html, 'html.parser')
+
+    keyword_div = soup.find('h6', string="Keyword")
+    keyword = keyword_div.find_next('div').text if keyword_div else None
+
+    mnemonic_div = soup.find('div', class_='mnemonic')
+    mnemonic = mnemonic_div.decode_contents().strip() if mnemonic_div else None
+
+    return [keyword, mnemonic]
+
+
+def reference_search_page(html):
+    soup = BeautifulSoup(html, 'html.parser')
+
+    subsection_meanings = soup.find('div', class_='subsection-meanings')
+    if subsection_meanings:
+        first_description = subsection_meanings.find('div', class_='description')
+        return first_description.text.strip() if first_description else ""
+    return ""
+
+
+PARSERS = {'kanji': (reference_kanji_page, parse_kanji_page), 'search': (reference_search_page, parse_search_page)}
+
+
+def load_pages():
+    pages = []
+    for file_path in sorted(glob.glob(os.path.join(PAGES, '*.html'))):
+        with open(file_path, 'r', encoding='utf-8') as file:
+            pages.append((os.path.basename(file_path), file.read()))
+    return pages
+
+
+def kind(name):
+    return name.split('-', 1)[0]
+
+
+def mutate(rng, html):
+    for _ in range(rng.randint(1, 4)):
+        start = rng.randrange(len(html))
+        if rng.random() < 0.2:
+            html = html[:start]
+        else:
+            html = html[:start] + html[start + rng.randint(1, 400):]
+        if not html:
+            break
+    return html
+
+
+def compare(kind_name, html):
+    """Return None when both parsers agree, or a description of how they differ."""
+    reference, parser = PARSERS[kind_name]
+    try:
+        expected = reference(html)
+    except AttributeError:
+        # "Keyword" heading with no div after it: the full parse crashes, the scanner returns None
+        return None if parser(html)[0] is None else "keyword found where the reference crashes"
+    except ParserRejectedMarkup:
+        # Markup html.parser itself gives up on, like a broken <![CDATA[
+        try:
+            parser(html)
+        except Exception:
+            return None
+        return "parsed markup the reference rejects"
+    actual = parser(html)
+    return None if actual == expected else f"expected {expected!r}, got {actual!r}"
+
+
+def timed(function, html):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        function(html)
+    return (time.perf_counter() - start) / REPEAT
+
+
+def main():
+    fuzzed = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    pages = load_pages()
+    failures = 0
+    for name, html in pages:
+        difference = compare(kind(name), html)
+        if difference:
+            failures += 1
+            print(f"🔴 {name}: {difference}")
+
+    rng = random.Random(0)
+    for i in range(fuzzed):
+        name, html = rng.choice(pages)
+        mutated = mutate(rng, html)
+        difference = compare(kind(name), mutated)
+        if difference:
+            failures += 1
+            if failures <= 10:
+                print(f"🔴 {name} (fuzzed #{i}): {difference}")
+    print(f"{len(pages)} saved pages and {fuzzed} fuzzed pages checked, {failures} differences\n")
+
+    print(f"{'Page':<30}{'KB':>6}{'BeautifulSoup (ms)':>20}{'jpdb_pages (ms)':>17}{'Speedup':>9}")
+    totals = [0.0, 0.0]
+    for name, html in pages:
+        reference, parser = PARSERS[kind(name)]
+        before, after = timed(reference, html), timed(parser, html)
+        totals[0] += before
+        totals[1] += after
+        print(f"{name:<30}{len(html.encode()) / 1024:>6.1f}{before * 1000:>20.2f}{after * 1000:>17.2f}{before / after:>8.1f}x")
+    print(f"{'total':<30}{'':>6}{totals[0] * 1000:>20.2f}{totals[1] * 1000:>17.2f}{totals[0] / totals[1]:>8.1f}x")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare json.load with the streaming reader on a large synthetic JPDB reviews.json.
+
+Each reader runs in a fresh interpreter so peak RSS is measured separately. Run
+from the repository root:
+
+    python benchmarks/jpdb-reviews.py [size in MB]
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GRADES = ['okay', 'hard', 'something', 'unknown', 'known', 'easy']
+
+CHILD_ENV = dict(os.environ, PYTHONPATH=REPOSITORY)  # Each reader runs in a fresh interpreter
+READER = """
+import hashlib, json, resource, sys, time
+from jpdb_reviews import iter_review_cards
+start = time.perf_counter()
+if sys.argv[1] == 'json.load':
+    with open(sys.argv[2], 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    cards = []
+    for section, field in (('cards_vocabulary_jp_en', 'spelling'), ('cards_kanji_keyword_char', 'character')):
+        for card in data.get(section, []):
+            tag = 'known' if any(review['grade'] == 'easy' for review in card['reviews']) else 'new'
+            cards.append((section, card[field], tag))
+else:
+    cards = list(iter_review_cards(sys.argv[2]))
+elapsed = time.perf_counter() - start
+digest = hashlib.sha256(json.dumps(cards, ensure_ascii=False).encode('utf-8')).hexdigest()
+print(json.dumps({'seconds': elapsed, 'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'cards': len(cards), 'digest': digest}))
+"""
+
+
+def review(rng):
+    return {'timestamp': rng.randrange(1_600_000_000, 1_700_000_000), 'grade': rng.choice(GRADES), 'from_anki': False}
+
+
+def write_export(file_path, target_mb, seed=0):
+    rng = random.Random(seed)
+    target = target_mb * 1024 * 1024
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write('{"version": 1, "cards_vocabulary_en_jp": [], "cards_vocabulary_jp_en": [')
+        written = 0
+        index = 0
+        while written < target * 0.8:
+            card = {'vid': index, 'spelling': chr(0x4E00 + index % 20000) + 'する',
+                    'reading': 'よみ', 'reviews': [review(rng) for _ in range(rng.randrange(1, 60))]}
+            text = (',' if index else '') + json.dumps(card, ensure_ascii=False)
+            file.write(text)
+            written += len(text.encode('utf-8'))
+            index += 1
+        file.write('], "cards_kanji_keyword_char": [')
+        index = 0
+        while written < target:
+            card = {'character': chr(0x4E00 + index % 20000),
+                    'reviews': [review(rng) for _ in range(rng.randrange(1, 60))]}
+            text = (',' if index else '') + json.dumps(card, ensure_ascii=False)
+            file.write(text)
+            written += len(text.encode('utf-8'))
+            index += 1
+        file.write('], "cards_kanji_char_keyword": []}')
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, 'reviews.json')
+        write_export(file_path, size_mb)
+        print(f"Synthetic export: {os.path.getsize(file_path) / 1024 / 1024:.0f} MB")
+        results = {}
+        for reader in ('json.load', 'streaming'):
+            output = subprocess.run([sys.executable, '-c', READER, reader, file_path],
+                                    capture_output=True, text=True, check=True, env=CHILD_ENV)
+            results[reader] = json.loads(output.stdout)
+            result = results[reader]
+            print(f"{reader:<12}{result['seconds']:>8.2f} s{result['rss_mb']:>10.0f} MB peak RSS  ({result['cards']} cards)")
+        same = results['json.load']['digest'] == results['streaming']['digest']
+        print("Results match" if same else "🔴 Results differ")
+
+
+if __name__ == "__main__":
+    main()
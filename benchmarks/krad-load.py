@@ -0,0 +1,59 @@
+"""Compare loading the KRADFILE as indented JSON with the binary index.
+
+Each loader runs in a fresh interpreter so load time and peak RSS are not
+skewed by the other. Run from any directory, e.g. the repository root:
+
+    python benchmarks/krad-load.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from kanjitoradical import krad_index
+
+KRADFILE = os.path.join(REPOSITORY, krad_index.KRADFILE)
+KRAD_INDEX = os.path.join(REPOSITORY, krad_index.KRAD_INDEX)
+RUNS = 5
+CHILD_ENV = dict(os.environ, PYTHONPATH=REPOSITORY)  # Each loader runs in a fresh interpreter
+
+LOADER = """
+import json, resource, sys, time
+from kanjitoradical.krad_index import KradIndex
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if sys.argv[1] == 'json':
+    with open({kradfile!r}, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+else:
+    data = KradIndex({krad_index!r})
+loaded = time.perf_counter()
+for kanji in '亜唖娃阿哀愛挨姶逢葵茜穐悪握渥旭葦芦鯵梓圧斡扱宛姐虻飴絢綾鮎或粟袷安庵按暗案闇鞍杏':
+    data.get(kanji, [])
+done = time.perf_counter()
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{'load': loaded - start, 'lookup': done - loaded, 'rss_kb': after - before}}))
+""".format(kradfile=KRADFILE, krad_index=KRAD_INDEX)
+
+
+def run(kind):
+    results = []
+    for _ in range(RUNS):
+        output = subprocess.run([sys.executable, '-c', LOADER, kind], capture_output=True, text=True, check=True,
+                                env=CHILD_ENV)
+        results.append(json.loads(output.stdout))
+    return {key: min(result[key] for result in results) for key in results[0]}
+
+
+def main():
+    print(f"{'Format':<10}{'Load (ms)':<12}{'50 lookups (ms)':<18}{'Peak RSS delta (KB)':<20}")
+    for kind in ('json', 'index'):
+        result = run(kind)
+        print(f"{kind:<10}{result['load'] * 1000:<12.2f}{result['lookup'] * 1000:<18.3f}{result['rss_kb']:<20}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compare resolving note ids to card ids with one `nid:1 or nid:2 ...` search against
+the cached notesInfo card lists the planner uses.
+
+AnkiConnect is replaced by an in-process fake, so the numbers show request count,
+request size and client-side time, not the cost of Anki's search parser. Run from any
+directory, e.g. the repository root:
+
+    python benchmarks/note-cards.py [notes]
+"""
+import os
+import sys
+import tempfile
+import time
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from anki_cache import KnowledgeCache
+from anki_connect import AnkiConnect
+from fake_anki import FakeAnkiSession
+
+
+def or_query(anki, note_ids):
+    query = ' or '.join([f'nid:{nid}' for nid in note_ids])
+    return anki.invoke('findCards', query=query)
+
+
+def cached_card_lists(cache, note_ids):
+    return [card_id for note in cache.note_data(note_ids) for card_id in note['cards']]
+
+
+def measure(label, session, function):
+    requests, request_bytes = session.requests, session.request_bytes
+    start = time.perf_counter()
+    cards = function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28}{session.requests - requests:>9}{(session.request_bytes - request_bytes) / 1024:>12.0f}"
+          f"{elapsed * 1000:>12.1f}{len(cards):>9}")
+
+
+def main():
+    note_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    session = FakeAnkiSession()
+    for note_id in range(1_700_000_000_000, 1_700_000_000_000 + note_count):
+        session.add_note(note_id, "yomitan Japanese", {'Expression': '食べる', 'Kanji': '食'}, ['locked'], card_count=2)
+    note_ids = list(session.notes)
+    anki = AnkiConnect(session=session)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = KnowledgeCache(anki, os.path.join(directory, 'cache.sqlite'))
+        print(f"{note_count} notes")
+        print(f"{'Path':<28}{'Requests':>9}{'Sent (KB)':>12}{'Time (ms)':>12}{'Cards':>9}")
+        measure("nid:... or nid:... search", session, lambda: or_query(anki, note_ids))
+        measure("notesInfo card lists, cold", session, lambda: cached_card_lists(cache, note_ids))
+        measure("notesInfo card lists, warm", session, lambda: cached_card_lists(cache, note_ids))
+
+
+if __name__ == "__main__":
+    main()
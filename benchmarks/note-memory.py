@@ -0,0 +1,151 @@
+"""Measure the peak memory of reading notes as full notesInfo dicts against projected NoteRecords.
+
+The synthetic collection's vocab notes get the bulky fields of a real vocab note
+type (glossary HTML, example sentences, audio and image references), and it is
+served over localhost HTTP so the client parses responses like it would from
+Anki. Each reader runs in a fresh interpreter, first with an empty note/card
+cache (download and read) and then with the cache it left behind (read only),
+and reports how far its peak RSS rose above what it used before reading (Linux):
+
+- jlpt-check: the known notes, every field decoded and all responses of the
+  download held at once, as before, against KNOWN_FIELDS records streamed in
+- update snapshot: the snapshot with every field of every card's note, against
+  fetch_snapshot() with only the fields the planner reads
+
+Run from any directory, e.g. the repository root:
+
+    python benchmarks/note-memory.py [--vocab 50000]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from fake_anki import serve
+from fixtures import CONFIG, make_collection
+
+GLOSSARY_ENTRIES = 6
+# The fresh interpreter of each reader finds the modules the same way
+CHILD_ENV = dict(os.environ, PYTHONPATH=os.pathsep.join([REPOSITORY, os.path.join(REPOSITORY, 'benchmarks')]))
+READER = """
+import json, sys
+from anki_cache import KnowledgeCache
+from anki_connect import AnkiConnect
+from fixtures import CONFIG
+from jlpt_coverage import KNOWN_FIELDS
+from update_plan import fetch_snapshot
+
+workload, variant, url, cache_path = sys.argv[1:]
+
+
+def memory_kb(key):
+    # VmHWM, unlike ru_maxrss, isn't inherited from the large process that started this one
+    with open('/proc/self/status') as status:
+        return next(int(line.split()[1]) for line in status if line.startswith(key + ':'))
+
+
+class UnstreamedCache(KnowledgeCache):
+    # Every response of a sync at once, as the cache downloaded before streaming
+    def _stream(self, action, param, ids):
+        yield [item for chunk in super()._stream(action, param, ids) for item in chunk]
+
+
+def plain_snapshot(anki, cache, config):
+    # fetch_snapshot() with every field of every note kept
+    fetch_fields = cache.note_data, cache.card_data
+    cache.note_data = lambda ids, fields=None: fetch_fields[0](ids)
+    cache.card_data = lambda ids, fields=None: fetch_fields[1](ids)
+    cache.note_records = lambda ids, fields: [
+        type('Record', (), {'values': tuple(note['fields'].get(name, {}).get('value') for name in fields)})
+        for note in fetch_fields[0](ids)]
+    return fetch_snapshot(anki, cache, config)
+
+
+anki = AnkiConnect(url=url)
+anki.invoke('version')
+cache = (UnstreamedCache if variant == 'before' else KnowledgeCache)(anki, cache_path)
+before = memory_kb('VmRSS')
+try:
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')  # Reset VmHWM to the current RSS
+except OSError:
+    pass
+if workload == 'jlpt-check':
+    note_ids = anki.invoke('findNotes', query='tag:known')
+    result = cache.note_data(note_ids) if variant == 'before' else cache.note_records(note_ids, KNOWN_FIELDS)
+    items = len(result)
+else:
+    result = (plain_snapshot if variant == 'before' else fetch_snapshot)(anki, cache, CONFIG)
+    items = len(result['cards'])
+after = memory_kb('VmHWM')
+print(json.dumps({'items': items, 'peak_kb': after - before}))
+"""
+
+
+def add_vocab_fields(session, seed=0):
+    """Give every vocab note the fields of a real vocab note type, a few KB of them."""
+    rng = random.Random(seed)
+    for note in session.notes.values():
+        if note['modelName'] != CONFIG['vocab_note_type']:
+            continue
+        expression = note['fields']['Expression']['value']
+        glossary = ''.join(f'<li><span class="pos">noun</span> definition {rng.randrange(10 ** 6)} of {expression}, '
+                           f'with a few words of explanation</li>' for _ in range(GLOSSARY_ENTRIES))
+        extra = {
+            'Reading': f'{expression}[よみ{rng.randrange(100)}]',
+            'Glossary': f'<div class="glossary"><ol>{glossary}</ol></div>',
+            'Sentence': f'<span class="sentence">{expression}を使った例文です。{rng.randrange(10 ** 6)}</span>',
+            'SentenceTranslation': f'An example sentence using {expression}, number {rng.randrange(10 ** 6)}.',
+            'Audio': f'[sound:yomitan_audio_{note["noteId"]}.mp3]',
+            'Picture': f'<img src="yomitan_image_{note["noteId"]}.png">',
+            'Frequency': f'<ul><li>JPDB: {rng.randrange(50000)}</li><li>Novels: {rng.randrange(50000)}</li></ul>',
+        }
+        order = len(note['fields'])
+        for i, (name, value) in enumerate(extra.items()):
+            note['fields'][name] = {'value': value, 'order': order + i}
+
+
+def run(workload, variant, url, cache_path):
+    output = subprocess.run([sys.executable, '-c', READER, workload, variant, url, cache_path],
+                            check=True, capture_output=True, text=True, env=CHILD_ENV).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of full notes against projected note records.")
+    parser.add_argument('--vocab', type=int, default=50000, help="vocab notes in the collection")
+    args = parser.parse_args()
+
+    session = make_collection(args.vocab)
+    add_vocab_fields(session)
+    server = serve(session, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://localhost:{server.server_address[1]}"
+    note_bytes = sum(len(json.dumps(note['fields'], ensure_ascii=False).encode('utf-8'))
+                     for note in session.notes.values())
+    print(f"{len(session.notes)} notes, {note_bytes / 2 ** 20:.0f} MB of fields\n")
+
+    print(f"{'Workload':<18}{'Cache':<7}{'Items':>8}{'Before (MB)':>13}{'After (MB)':>12}{'Saved':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for workload in ('jlpt-check', 'update snapshot'):
+            peaks = {}
+            for variant in ('before', 'after'):
+                cache_path = os.path.join(directory, f'{workload}-{variant}.sqlite')
+                peaks[variant] = [run(workload, variant, url, cache_path) for _ in ('cold', 'warm')]
+            for i, cache in enumerate(('cold', 'warm')):
+                before, after = peaks['before'][i], peaks['after'][i]
+                saved = 1 - after['peak_kb'] / before['peak_kb'] if before['peak_kb'] else 0
+                print(f"{workload:<18}{cache:<7}{after['items']:>8}{before['peak_kb'] / 1024:>13.1f}"
+                      f"{after['peak_kb'] / 1024:>12.1f}{saved:>8.0%}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Time build_plan() against a synthetic snapshot, with no Anki or network access.
+
+The snapshot comes from fixtures.make_snapshot(). Run from any directory, e.g. the
+repository root:
+
+    python benchmarks/plan-fixture.py [vocab notes]
+"""
+import json
+import os
+import sys
+import time
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from fixtures import CONFIG, KRAD_INDEX, make_snapshot
+from kanjitoradical.krad_index import KradIndex
+from update_plan import build_plan
+
+
+def main():
+    vocab_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    kanji_data = KradIndex(KRAD_INDEX)
+    snapshot = make_snapshot(vocab_count, kanji_data)
+    keywords = lambda characters: {character: ["keyword", "mnemonic"] for character in characters}
+
+    start = time.perf_counter()
+    plan = build_plan(snapshot, kanji_data, keywords, CONFIG)
+    elapsed = time.perf_counter() - start
+
+    print(f"Snapshot: {len(snapshot['cards'])} cards, {len(snapshot['missing_kanji_notes'])} notes missing kanji")
+    print(f"Planned {len(plan['actions'])} actions in {elapsed * 1000:.1f} ms "
+          f"({len(json.dumps(plan, ensure_ascii=False)) / 1024:.0f} KB as JSON)")
+    print(json.dumps(plan['summary'], ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
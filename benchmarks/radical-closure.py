@@ -0,0 +1,95 @@
+"""Compare the precomputed radical closure table with decomposing kanji on the fly.
+
+Checks the closure of every kanji in the table against a walk of the binary
+KRADFILE index, times both, and times build_plan() on a synthetic snapshot one
+level deep and with the closure. Kanji listing each other (口 and 囗) are
+variants of one radical, and the walk never steps from one variant to another
+below the kanji it starts from, so 品 is built from 口 but not from 囗. Run after
+`python kanji.py build-krad`, from any directory, e.g. the repository root:
+
+    python benchmarks/radical-closure.py [vocab notes]
+"""
+import os
+import sys
+import time
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from fixtures import CONFIG, KRAD_CLOSURE, KRAD_INDEX, make_snapshot
+from kanjitoradical.krad_closure import RadicalClosure, closure_masks
+from kanjitoradical.krad_index import KradIndex
+from update_plan import build_plan
+
+
+def reachable(kanji_data, kanji):
+    """Every component of kanji at any depth, looked up one level at a time."""
+    seen = set()
+    pending = list(kanji_data.get(kanji, []))
+    while pending:
+        radical = pending.pop()
+        if radical not in seen:
+            seen.add(radical)
+            pending.extend(kanji_data.get(radical, []))
+    return seen
+
+
+def walk(kanji_data, reach, kanji):
+    """Components of kanji at any depth, not stepping between variants below kanji and leaving its own out."""
+    def variants(character):
+        return {other for other in reach.get(character, ()) if character in reach.get(other, ())} | {character}
+
+    own = variants(kanji)
+    seen = set()
+    pending = [(member, True) for member in own]
+    while pending:
+        character, top = pending.pop()
+        skip = set() if top else variants(character)
+        for radical in kanji_data.get(character, []):
+            if radical not in skip and radical not in seen:
+                seen.add(radical)
+                pending.append((radical, False))
+    return seen - own
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    vocab_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    kanji_data = KradIndex(KRAD_INDEX)
+    mapping = {kanji: kanji_data[kanji] for kanji in kanji_data}
+
+    _, build_ms = timed(closure_masks, mapping)
+    closure, load_ms = timed(RadicalClosure.open, KRAD_CLOSURE)
+    print(f"Closure of {len(mapping)} kanji computed in {build_ms:.1f} ms, table loaded in {load_ms:.2f} ms")
+
+    reach = {kanji: reachable(kanji_data, kanji) for kanji in mapping}
+    walked, walk_ms = timed(lambda: {kanji: walk(kanji_data, reach, kanji) for kanji in mapping})
+    looked_up, lookup_ms = timed(lambda: {kanji: closure.get(kanji) for kanji in mapping})
+    mismatches = [kanji for kanji in mapping if set(looked_up[kanji]) != walked[kanji]]
+    deeper = sum(1 for kanji in mapping if len(walked[kanji]) > len(set(mapping[kanji]) - {kanji}))
+    print(f"{deeper} kanji have components below the first level, "
+          f"{sum(map(len, walked.values())) / len(walked):.1f} components per kanji at any depth")
+    print(f"{'Every kanji':<24}{'walk':>10} {walk_ms:8.1f} ms   table {lookup_ms:8.1f} ms")
+
+    snapshot = make_snapshot(vocab_count, kanji_data)
+    keywords = lambda characters: {character: ["keyword", "mnemonic"] for character in characters}
+    direct, direct_ms = timed(build_plan, snapshot, kanji_data, keywords, CONFIG)
+    deep, deep_ms = timed(build_plan, snapshot, kanji_data, keywords, CONFIG, closure)
+    print(f"{'build_plan()':<24}{'one level':>10} {direct_ms:8.1f} ms   table {deep_ms:8.1f} ms")
+    for key in ('radicals_created', 'kanji_created'):
+        print(f"  {key:<22}{direct['summary'][key]:>10}            {deep['summary'][key]:>8}")
+    print(f"  {'kanji unlocked':<22}{direct['summary']['unlocked'][CONFIG['kanji_note_type']]:>10}"
+          f"            {deep['summary']['unlocked'][CONFIG['kanji_note_type']]:>8}")
+
+    if mismatches:
+        print(f"🔴 {len(mismatches)} closures differ from the walk: {''.join(mismatches[:20])}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
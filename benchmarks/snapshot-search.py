@@ -0,0 +1,95 @@
+"""Compare fetching the update snapshot with plain tag searches against the filtered searches.
+
+The plain snapshot asks for every `tag:new` and `tag:known` card and leaves it to
+the planner to find the new cards past the known interval and the known kanji and
+radicals. fetch_snapshot() puts those conditions in the searches themselves
+(`tag:new prop:ivl>=21`, `tag:known note:...`). Both run against the same large
+synthetic collection, each with an empty note/card cache, and must lead to the
+same plan. Run from any directory, e.g. the repository root:
+
+    python benchmarks/snapshot-search.py [--vocab 100000] [--latency 0.002]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from anki_cache import KnowledgeCache
+from anki_connect import AnkiConnect
+from fixtures import CONFIG, KRAD_INDEX, make_collection
+from instrumentation import Recorder
+from kanjitoradical.krad_index import KradIndex
+from update_plan import build_plan, fetch_snapshot, plan_digest
+
+
+def fetch_snapshot_plain(anki, cache, config):
+    """fetch_snapshot() as it was before the searches were filtered."""
+    missing_kanji_ids = anki.invoke('findNotes', query=f'note:"{config["vocab_note_type"]}" Kanji: tag:locked')
+    deck_note_ids = anki.invoke('findNotes', query=f'deck:"{config["kanji_deck"]}"')
+    new_cards, known_cards, locked_cards = anki.invoke_all('findCards', [
+        {'query': 'tag:new'}, {'query': 'tag:known'}, {'query': 'tag:locked'},
+    ])
+    deck_characters = {
+        note['fields']['Character']['value']
+        for note in cache.note_data(deck_note_ids) if 'Character' in note['fields']
+    }
+    return {
+        'missing_kanji_notes': cache.note_data(missing_kanji_ids),
+        'deck_characters': sorted(deck_characters),
+        'cards': cache.card_data(list(dict.fromkeys(new_cards + known_cards + locked_cards))),
+        'new': new_cards,
+        'known': known_cards,
+        'locked': locked_cards,
+    }
+
+
+def measure(fetch, session, directory, name):
+    recorder = Recorder()
+    anki = AnkiConnect(session=session, recorder=recorder)
+    cache = KnowledgeCache(anki, os.path.join(directory, f'{name}.sqlite'))
+    server_time = session.server_time
+    start = time.perf_counter()
+    snapshot = fetch(anki, cache, CONFIG)
+    elapsed = time.perf_counter() - start
+    requests = [stats for phase in recorder.requests.values() for stats in phase.values()]
+    cache.db.close()
+    return snapshot, {
+        'requests': sum(stats.count for stats in requests),
+        'sent': sum(stats.sent for stats in requests),
+        'received': sum(stats.received for stats in requests),
+        'seconds': elapsed,
+        'server_seconds': session.server_time - server_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plain against filtered snapshot searches on a fake collection.")
+    parser.add_argument('--vocab', type=int, default=100000, help="vocab notes in the collection")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds the fake waits per request")
+    args = parser.parse_args()
+
+    session = make_collection(args.vocab, latency=args.latency)
+    kanji_data = KradIndex(KRAD_INDEX)
+    keywords = lambda characters: {character: ["keyword", "mnemonic"] for character in characters}
+    print(f"{len(session.notes)} notes, {len(session.cards)} cards\n")
+    print(f"{'Searches':<10}{'Requests':>9}{'Sent (KB)':>11}{'Received (KB)':>15}{'Time (ms)':>11}"
+          f"{'Anki (ms)':>11}{'Cards':>8}")
+    digests = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, fetch in (('plain', fetch_snapshot_plain), ('filtered', fetch_snapshot)):
+            snapshot, stats = measure(fetch, session, directory, name)
+            digests[name] = plan_digest(build_plan(snapshot, kanji_data, keywords, CONFIG))
+            print(f"{name:<10}{stats['requests']:>9}{stats['sent'] / 1024:>11.0f}{stats['received'] / 1024:>15.0f}"
+                  f"{stats['seconds'] * 1000:>11.1f}{stats['server_seconds'] * 1000:>11.1f}{len(snapshot['cards']):>8}")
+
+    same = digests['plain'] == digests['filtered']
+    print(f"\nPlans {'match' if same else '🔴 differ'}")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
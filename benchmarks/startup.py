@@ -0,0 +1,71 @@
+"""Check the startup time of every kanji.py command against kanji.STARTUP_BUDGET_MS.
+
+Each command's modules are imported in a fresh interpreter under `-X importtime`,
+and the time of everything imported after the interpreter's own startup (site) is
+added up. None of them may load requests or BeautifulSoup, which are imported on
+first use. Also times `python kanji.py --help` end to end. Run from any directory,
+e.g. the repository root:
+
+    python benchmarks/startup.py
+"""
+import os
+import subprocess
+import sys
+import time
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from kanji import COMMANDS, STARTUP_BUDGET_MS
+
+RUNS = 5
+CHILD_ENV = dict(os.environ, PYTHONPATH=REPOSITORY)  # Each command is imported in a fresh interpreter
+LAZY = ('requests', 'bs4')  # Must not be imported before a command needs them
+
+
+def import_time(modules):
+    """Return (milliseconds, names of the modules imported) of importing modules in a fresh interpreter."""
+    code = '; '.join(f'import {module}' for module in modules)
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], check=True,
+                            capture_output=True, text=True, env=CHILD_ENV).stderr
+    total, names, after_site = 0, set(), False
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if after_site:
+            names.add(name.strip())
+            if not name.startswith('  '):  # Top-level import, its cumulative time covers the nested ones
+                total += int(cumulative)
+        elif name.strip() == 'site':
+            after_site = True
+    return total / 1000, names
+
+
+def wall_time(args):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], check=True, capture_output=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    failures = 0
+    print(f"{'Command':<16}{'Imports (ms)':>13}  Lazy dependencies loaded")
+    for command, (module, _) in COMMANDS.items():
+        modules = ['kanji', module or 'kanjitoradical.krad_build']
+        results = [import_time(modules) for _ in range(RUNS)]
+        milliseconds = min(result[0] for result in results)
+        loaded = [name for name in LAZY if name in results[0][1]]
+        ok = milliseconds <= STARTUP_BUDGET_MS and not loaded
+        failures += not ok
+        print(f"{command:<16}{milliseconds:>13.1f}  {', '.join(loaded) or '-'}{'' if ok else '  🔴 over budget'}")
+
+    interpreter = min(wall_time(['-c', 'pass']) for _ in range(RUNS))
+    help_time = min(wall_time([os.path.join(REPOSITORY, 'kanji.py'), '--help']) for _ in range(RUNS))
+    print(f"\nBudget {STARTUP_BUDGET_MS} ms. `python -c pass` {interpreter:.1f} ms, "
+          f"`python kanji.py --help` {help_time:.1f} ms")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
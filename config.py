@@ -0,0 +1,18 @@
+"""Deck, note type and file names shared by the commands.
+
+Nothing is imported here, so any command, however light, can read them without
+pulling in the modules of another.
+"""
+KANJI_DECK = "Kanji and Radicals"
+VOCAB_NOTE_TYPE = "yomitan Japanese" #"JPDB Japanese Vocab"
+KANJI_NOTE_TYPE = "Japanese Kanji"
+RADICAL_NOTE_TYPE = "Japanese Radicals"
+
+ANKI_CACHE = ".anki-cache.sqlite"  # Local copy of note and card data, refreshed incrementally
+JPDB_CACHE = ".jpdb-cache.sqlite"  # jpdb.io pages already fetched
+CHECKPOINT_FILE = ".update-cards.checkpoint.json"  # Progress of `kanji.py update` while it applies changes
+
+KNOWN_INTERVAL = 21  # Days before a new card counts as known
+POLL_INTERVAL = 300  # Seconds between checks for changes in Anki, `kanji.py update --daemon`
+# Kanji wait on every component at any depth, not only the radicals their note lists
+DEEP_RADICALS = False
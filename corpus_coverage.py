@@ -0,0 +1,156 @@
+"""`python kanji.py corpus`: which kanji of a text corpus are known, and what they are still missing.
+
+Files are split into CHUNK_SIZE byte ranges cut at UTF-8 character boundaries.
+A process pool reads and counts the kanji of each range, and the per-range
+counters are merged as they come back. Only a range and its kanji are ever
+in memory, so the corpus can be far larger than RAM. The kanji are then
+matched against the Kanji and Radicals deck and the KRADFILE.
+benchmarks/corpus-coverage.py measures throughput on a synthetic corpus.
+"""
+import csv
+import os
+import time
+from collections import Counter
+
+from anki_cache import KnowledgeCache
+from anki_connect import AnkiConnect
+from anki_search import deck
+from config import ANKI_CACHE, KANJI_DECK
+from japanese_text import strip_non_kanji
+from kanjitoradical.krad_closure import load_radical_closure
+from kanjitoradical.krad_index import load_kanji_data
+
+CHUNK_SIZE = 16 * 2 ** 20  # Bytes per task
+TOP_N = 20
+KNOWN, NEW, LOCKED, MISSING = 'known', 'new', 'locked', 'missing'
+STATUS_TAGS = (KNOWN, NEW, LOCKED)  # A note's first tag found wins, and so does the best note of a character
+
+
+def _boundary(file, offset):
+    """Move offset forward to the start of a UTF-8 character."""
+    file.seek(offset)
+    for byte in file.read(4):
+        if byte & 0xC0 != 0x80:  # Not a continuation byte
+            break
+        offset += 1
+    return offset
+
+
+def split_ranges(path, chunk_size=CHUNK_SIZE):
+    """Return (path, start, end) byte ranges of the file, none of them splitting a character."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as file:
+        cuts = [0] + [_boundary(file, offset) for offset in range(chunk_size, size, chunk_size)] + [size]
+    return [(path, start, end) for start, end in zip(cuts, cuts[1:]) if end > start]
+
+
+def count_range(task):
+    """Return (kanji counter, bytes, characters) of one byte range."""
+    path, start, end = task
+    with open(path, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8', errors='replace')
+    return Counter(strip_non_kanji(text)), end - start, len(text)
+
+
+def count_kanji(paths, jobs=None, chunk_size=CHUNK_SIZE):
+    """Count the kanji of every file. Returns (Counter, {'bytes', 'characters', 'processes', 'seconds'})."""
+    start = time.perf_counter()
+    tasks = [task for path in paths for task in split_ranges(path, chunk_size)]
+    counts = Counter()
+    stats = {'bytes': 0, 'characters': 0}
+
+    def merge(results):
+        for counter, size, characters in results:
+            counts.update(counter)
+            stats['bytes'] += size
+            stats['characters'] += characters
+
+    stats['processes'] = min(jobs or os.cpu_count() or 1, len(tasks)) or 1
+    if stats['processes'] == 1:
+        merge(map(count_range, tasks))  # Not worth starting a pool
+    else:
+        from concurrent.futures import ProcessPoolExecutor  # multiprocessing takes longer to import than the rest
+        with ProcessPoolExecutor(max_workers=stats['processes']) as executor:
+            merge(executor.map(count_range, tasks))
+    stats['seconds'] = time.perf_counter() - start
+    return counts, stats
+
+
+def character_statuses(anki, cache, deck_name):
+    """Return {character: KNOWN, NEW or LOCKED} for the kanji and radical notes of deck_name."""
+    statuses = {}
+    for note in cache.note_records(anki.invoke('findNotes', query=deck(deck_name)), ['Character']):
+        character, = note.values
+        status = next((tag for tag in STATUS_TAGS if tag in note.tags), None)
+        if not character or status is None:
+            continue
+        if character not in statuses or STATUS_TAGS.index(status) < STATUS_TAGS.index(statuses[character]):
+            statuses[character] = status
+    return statuses
+
+
+def analyze(counts, kanji_data, statuses, closure=None):
+    """Return a row per kanji, most frequent first, with its status and the radicals not known yet.
+
+    With a RadicalClosure the missing radicals are all the components the kanji
+    waits on in `kanji.py update --deep-radicals`, not only the ones it lists.
+    """
+    total = sum(counts.values())
+    rows = []
+    covered = 0
+    for kanji, count in counts.most_common():
+        covered += count
+        radicals = kanji_data.get(kanji, [])
+        waits_on = closure.expand(radicals, kanji) if closure is not None else radicals
+        rows.append({
+            'kanji': kanji,
+            'count': count,
+            'per_million': round(count * 1e6 / total, 1),
+            'cumulative_percent': round(covered * 100 / total, 2),
+            'status': statuses.get(kanji, MISSING),
+            'radicals': ' '.join(radicals),
+            'missing_radicals': ' '.join(radical for radical in waits_on if statuses.get(radical) != KNOWN),
+        })
+    return rows
+
+
+def write_tsv(rows, file_path):
+    with open(file_path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]) if rows else ['kanji'], delimiter='\t')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_report(rows, stats):
+    megabytes = stats['bytes'] / 2 ** 20
+    print(f"📊 Read {megabytes:.1f} MB ({stats['characters']} characters) in {stats['seconds']:.1f} s, "
+          f"{megabytes / stats['seconds']:.1f} MB/s with {stats['processes']} processes")
+    total = sum(row['count'] for row in rows)
+    if not total:
+        print("No kanji found")
+        return
+    print(f"{len(rows)} different kanji, {total} in all")
+    for status in (KNOWN, NEW, LOCKED, MISSING):
+        matching = [row for row in rows if row['status'] == status]
+        occurrences = sum(row['count'] for row in matching)
+        print(f"{status.capitalize():<10}{len(matching):>7} kanji{occurrences * 100 / total:>8.1f}% of the text")
+    print(f"\n📚 Most frequent kanji that aren't known yet")
+    print(f"{'Kanji':<8}{'Count':<10}{'Status':<10}{'Missing radicals'}")
+    print("-" * 44)
+    for row in [row for row in rows if row['status'] != KNOWN][:TOP_N]:
+        print(f"{row['kanji']:<8}{row['count']:<10}{row['status']:<10}{row['missing_radicals']}")
+
+
+def main(args):
+    statuses = {}
+    if not args.no_anki:
+        anki = AnkiConnect()
+        statuses = character_statuses(anki, KnowledgeCache(anki, ANKI_CACHE), KANJI_DECK)
+    counts, stats = count_kanji(args.files, args.jobs)
+    kanji_data = load_kanji_data()
+    closure = load_radical_closure(kanji_data) if args.deep_radicals else None
+    rows = analyze(counts, kanji_data, statuses, closure)
+    print_report(rows, stats)
+    write_tsv(rows, args.output)
+    print(f"\nEvery kanji saved to {args.output}")
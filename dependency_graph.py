@@ -0,0 +1,69 @@
+from config import KNOWN_INTERVAL
+from unlock_index import UnlockIndex
+
+
+def parse_dependencies(value):
+    return [dependency.strip() for dependency in value.split(',')]
+
+
+def card_character(card):
+    return card.get("fields", {}).get("Character", {}).get("value")
+
+
+class DependencyGraph:
+    """Radical -> kanji -> vocab dependency graph built from a single bulk card fetch.
+
+    `layers` maps each dependent note type to the field that lists its dependencies,
+    e.g. {"Japanese Kanji": "Radicals", "yomitan Japanese": "Kanji"}. Cards promoted
+    from new to known feed straight into the unlock index, so all layers are
+    resolved in one pass with the same rule. `expand` optionally maps a note type to
+    a function (dependencies, character) -> dependencies that widens what its
+    cards wait on, e.g. to every radical a kanji is built from at any depth.
+    """
+
+    def __init__(self, layers, known_interval=KNOWN_INTERVAL, expand=None):
+        self.layers = layers
+        self.known_interval = known_interval
+        self.expand = expand or {}
+        self.index = UnlockIndex()
+        self.new_cards = []
+        self.locked_cards = []
+
+    def build(self, cards, new_ids, known_ids, locked_ids):
+        new_ids, known_ids, locked_ids = set(new_ids), set(known_ids), set(locked_ids)
+        known_characters = set()
+        for card in cards:
+            card_id = card['cardId']
+            if card_id in known_ids and card_character(card) is not None:
+                known_characters.add(card_character(card))
+            if card_id in new_ids:
+                self.new_cards.append(card)
+            if card_id in locked_ids and card['modelName'] in self.layers:
+                self.locked_cards.append(card)
+
+        self.index = UnlockIndex(known_characters)
+        for card in self.locked_cards:
+            dependencies = parse_dependencies(card['fields'][self.layers[card['modelName']]]['value'])
+            if card['modelName'] in self.expand:
+                dependencies = self.expand[card['modelName']](dependencies, card_character(card))
+            self.index.add(card['cardId'], dependencies)
+        return self
+
+    def propagate(self):
+        """Resolve known and unlocked cards across all layers and return the changes to apply."""
+        known_cards = [card for card in self.new_cards if card['interval'] >= self.known_interval]
+        for card in known_cards:
+            if card_character(card) is not None:
+                self.index.mark_known(card_character(card))
+
+        unlocked_cards = [card for card in self.locked_cards if card['cardId'] in self.index.unlockable]
+        unlocked_by_type = {note_type: [] for note_type in self.layers}
+        for card in unlocked_cards:
+            unlocked_by_type[card['modelName']].append(card['cardId'])
+
+        return {
+            'known_cards': [card['cardId'] for card in known_cards],
+            'known_notes': list(dict.fromkeys(card['note'] for card in known_cards)),
+            'unlocked_cards': unlocked_by_type,
+            'unlocked_notes': list(dict.fromkeys(card['note'] for card in unlocked_cards)),
+        }
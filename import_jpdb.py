@@ -0,0 +1,121 @@
+"""`python kanji.py import-jpdb`: create kanji and radical notes for the cards of a jpdb.io reviews.json export."""
+from anki_connect import AnkiConnect
+from anki_search import field
+from config import JPDB_CACHE, KANJI_NOTE_TYPE, RADICAL_NOTE_TYPE
+from instrumentation import Recorder
+from kanjitoradical.krad_index import load_kanji_data
+from jpdb_scraper import JPDBScraper
+from jpdb_reviews import iter_review_cards
+from kanji_sets import create_sets, map_kanji_and_radicals
+from note_pipeline import create_notes
+
+ANKI_DECK = "Import Testing"
+VOCAB_NOTE_TYPE = "JPDB Japanese Vocab"  # jpdb.io's own, unlike config.VOCAB_NOTE_TYPE
+
+def process_json_data(file_path):
+    vocab_list = []
+    char_list = []
+
+    # Stream the export one card at a time instead of loading every review into memory
+    for section, name, tag in iter_review_cards(file_path):
+        if section == 'cards_vocabulary_jp_en':
+            vocab_list.append({'expression': name, 'tag': tag})
+        else:
+            char_list.append({'character': name, 'tag': tag})
+
+    return vocab_list, char_list
+
+def note_expressions_exist(anki, expressions):
+    queries = [{'query': field('Expression', expression)} for expression in expressions]
+    response = anki.invoke_all("findNotes", queries)
+    return response
+
+def keyword_and_mnemonic(page):
+    keyword, mnemonic = page or [None, None]
+    keyword = keyword if keyword is not None else "No keyword found"
+    mnemonic = mnemonic if mnemonic is not None else "No mnemonic found"
+    return keyword, mnemonic
+    
+def get_description(scraper, word):
+    description = scraper.get_description(word)
+    return description or ""
+
+def create_vocab_notes(anki, scraper, vocab_list):
+    existing = note_expressions_exist(anki, [word["expression"] for word in vocab_list])
+    scraper.get_descriptions([word["expression"] for word, exists in zip(vocab_list, existing) if not exists])
+
+    with anki.batch():
+        for word, exists in zip(vocab_list, existing):
+            if exists:
+                print(f"Skipping {word['expression']} as it already exists.")
+                continue
+            print(f"Processing {word['expression']}...")
+
+            description = get_description(scraper, word["expression"])
+
+            note = {
+                "deckName": ANKI_DECK,
+                "modelName": VOCAB_NOTE_TYPE,
+                "fields": {
+                    "Expression": word["expression"],
+                    "Meaning": description,
+                },
+                "tags": ["import_testing", "vocab", word["tag"]]
+            }
+            anki.queue("addNote", note=note)
+
+def create_cards(anki, scraper, data, is_radical):
+    total = len(data)  # Total number of items to process
+    char_type = 'radicals' if is_radical else 'kanji'
+    print(f'There are {total} {char_type} to process')
+
+    def make_note(character, details, page):
+        keyword, mnemonic = keyword_and_mnemonic(page)
+        if is_radical:
+            return {
+                "deckName": ANKI_DECK,
+                "modelName": RADICAL_NOTE_TYPE,
+                "fields": {
+                    "Character": character,
+                    "Keyword": keyword,
+                    "Mnemonic": mnemonic,
+                },
+                "tags": ["import_testing", "radical", details["tag"]]
+            }
+        return {
+            "deckName": ANKI_DECK,
+            "modelName": KANJI_NOTE_TYPE,
+            "fields": {
+                "Character": character,
+                "Keyword": keyword,
+                "Mnemonic": mnemonic,
+                "Radicals": ", ".join(details["radicals"])
+            },
+            "tags": ["import_testing", "kanji", details["tag"]]
+        }
+
+    # Existence check, scraping and note creation overlap, see note_pipeline.py
+    create_notes(anki, scraper, data, make_note)
+
+def create_kanji_and_radicals(anki, scraper, char_list):
+    kanji_mapping_data = load_kanji_data()
+    tags = {char['character']: char['tag'] for char in char_list}
+    kanji_and_radicals = map_kanji_and_radicals(tags, kanji_mapping_data, tags)
+    kanji_data, radical_data = create_sets(kanji_and_radicals)
+    create_cards(anki, scraper, kanji_data, is_radical=False)
+    create_cards(anki, scraper, radical_data, is_radical=True)
+
+def main(args):
+    recorder = Recorder()
+    anki = AnkiConnect(recorder=recorder)
+    scraper = JPDBScraper(cache_path=JPDB_CACHE, recorder=recorder)
+    try:
+        with recorder.phase("reviews"):
+            vocab_list, char_list = process_json_data(args.reviews)
+        # create_vocab_notes(anki, scraper, vocab_list)
+        with recorder.phase("notes"):
+            create_kanji_and_radicals(anki, scraper, char_list)
+    finally:
+        if args.report:
+            recorder.write(args.report)
+            print(f"📊 Report saved to {args.report}")
@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+OTHER_PHASE = "other"
+
+
+class RequestStats:
+    __slots__ = ('count', 'seconds', 'sent', 'received', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.sent = 0
+        self.received = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, seconds, sent, received):
+        self.count += 1
+        self.seconds += seconds
+        self.sent += sent
+        self.received += received
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+
+    def to_json(self):
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            'count': self.count,
+            'seconds': round(self.seconds, 6),
+            'sent_bytes': self.sent,
+            'received_bytes': self.received,
+            'latency': {label: count for label, count in zip(labels, self.buckets) if count},
+        }
+
+
+def payload_sizes(response):
+    """Return the (sent, received) body sizes of a requests response, zeros when unknown.
+
+    The received size is the Content-Length header, what came over the wire, or the
+    length of the body for a response sent without one.
+    """
+    request = getattr(response, 'request', None)
+    body = getattr(request, 'body', None) or b''
+    length = getattr(response, 'headers', {}).get('Content-Length')
+    if length is not None:
+        return len(body), int(length)
+    content = getattr(response, 'content', None)
+    return len(body), len(content) if isinstance(content, bytes) else 0
+
+
+class Recorder:
+    """Accounts AnkiConnect and jpdb.io requests, and the actions sent in them, per phase of a run.
+
+    The AnkiConnect client and the scraper call record() for every request and
+    count() for every action. Requests made on worker threads count towards the
+    phase the main thread is in. A recording costs a few microseconds, so it can
+    stay on for every run.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = OTHER_PHASE
+        self.started = time.perf_counter()
+        self.phase_seconds = {}
+        self.requests = {}
+        self.actions = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Account everything recorded inside the block to the phase name."""
+        previous, self.current = self.current, name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current = previous
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def record(self, kind, name, seconds, sent=0, received=0):
+        """Record one request of kind ('anki', 'jpdb.io' or 'parse') to name."""
+        with self.lock:
+            stats = self.requests.setdefault(self.current, {}).get(f"{kind}:{name}")
+            if stats is None:
+                stats = self.requests[self.current][f"{kind}:{name}"] = RequestStats()
+            stats.add(seconds, sent, received)
+
+    def count(self, kind, action, n=1):
+        """Count n actions sent, on their own or inside a `multi` request."""
+        with self.lock:
+            actions = self.actions.setdefault(self.current, {})
+            actions[f"{kind}:{action}"] = actions.get(f"{kind}:{action}", 0) + n
+
+    def report(self):
+        phases = {}
+        for name in dict.fromkeys([*self.phase_seconds, *self.requests, *self.actions]):
+            phases[name] = {
+                'seconds': round(self.phase_seconds.get(name, 0.0), 6),
+                'requests': {key: stats.to_json() for key, stats in sorted(self.requests.get(name, {}).items())},
+                'actions': dict(sorted(self.actions.get(name, {}).items())),
+            }
+        return {'seconds': round(time.perf_counter() - self.started, 6), 'phases': phases}
+
+    def write(self, file_path):
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(self.report(), file, ensure_ascii=False, indent=2)
@@ -0,0 +1,124 @@
+"""Classify and extract Japanese script characters with precomputed codepoint range tables.
+
+The tables are the Unicode 17 Han, Hiragana and Katakana script ranges, i.e. exactly what
+`regex` matches for \\p{Han}, \\p{Hiragana} and \\p{Katakana}. They are compiled into
+standard library character classes, so no third-party module is imported and matching
+runs in C. benchmarks/japanese-text.py verifies them against `regex` and regenerates them.
+"""
+import re
+from bisect import bisect_right
+
+# (first, last) codepoints, inclusive
+HAN_RANGES = (
+    (0x2E80, 0x2E99), (0x2E9B, 0x2EF3), (0x2F00, 0x2FD5), (0x3005, 0x3005), (0x3007, 0x3007),
+    (0x3021, 0x3029), (0x3038, 0x303B), (0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFA6D),
+    (0xFA70, 0xFAD9), (0x16FE2, 0x16FE3), (0x16FF0, 0x16FF6), (0x20000, 0x2A6DF), (0x2A700, 0x2B81E),
+    (0x2B820, 0x2CEAD), (0x2CEB0, 0x2EBE0), (0x2EBF0, 0x2EE5D), (0x2F800, 0x2FA1D), (0x30000, 0x3134A),
+    (0x31350, 0x33479),
+)
+HIRAGANA_RANGES = (
+    (0x3041, 0x3096), (0x309D, 0x309F), (0x1B001, 0x1B11F), (0x1B123, 0x1B123), (0x1B132, 0x1B132),
+    (0x1B150, 0x1B152), (0x1F200, 0x1F200),
+)
+KATAKANA_RANGES = (
+    (0x30A1, 0x30FA), (0x30FD, 0x30FF), (0x31F0, 0x31FF), (0x32D0, 0x32FE), (0x3300, 0x3357),
+    (0xFF66, 0xFF6F), (0xFF71, 0xFF9D), (0x1AFF0, 0x1AFF3), (0x1AFF5, 0x1AFFB), (0x1AFFD, 0x1AFFE),
+    (0x1B000, 0x1B000), (0x1B120, 0x1B122), (0x1B124, 0x1B128), (0x1B155, 0x1B155), (0x1B164, 0x1B168),
+)
+
+HAN = 'han'
+HIRAGANA = 'hiragana'
+KATAKANA = 'katakana'
+
+_SCRIPT_RANGES = sorted((first, last, script) for script, ranges in (
+    (HAN, HAN_RANGES), (HIRAGANA, HIRAGANA_RANGES), (KATAKANA, KATAKANA_RANGES)) for first, last in ranges)
+_STARTS = [first for first, _, _ in _SCRIPT_RANGES]
+_ASTRAL = '\\U00010000-\\U0010FFFF'
+
+
+def _char_class(*tables, bmp=False):
+    return ''.join(f'\\U{first:08X}-\\U{last:08X}' for ranges in tables for first, last in ranges
+                   if not bmp or last <= 0xFFFF)
+
+
+_JAPANESE = (HAN_RANGES, HIRAGANA_RANGES, KATAKANA_RANGES)
+# sre tests the astral ranges of a class one by one for every character, so the hot
+# patterns only carry the BMP ranges plus the whole astral plane, and the exact
+# astral ranges are applied only to text that has astral characters at all
+_PATTERNS = {
+    'astral': f'[{_ASTRAL}]',
+    'kanji_or_astral': f'[{_char_class(HAN_RANGES, bmp=True)}{_ASTRAL}]',
+    'non_kanji_bmp': f'[^{_char_class(HAN_RANGES, bmp=True)}{_ASTRAL}]+',
+    'non_kanji': f'[^{_char_class(HAN_RANGES)}]+',
+    'non_japanese_bmp': f'[^{_char_class(*_JAPANESE, bmp=True)}{_ASTRAL}]+',
+    'non_japanese': f'[^{_char_class(*_JAPANESE)}]+',
+    'non_japanese_line_bmp': f'[^{_char_class(*_JAPANESE, bmp=True)}\\n{_ASTRAL}]+',
+    'non_japanese_line': f'[^{_char_class(*_JAPANESE)}\\n]+',
+}
+
+
+class _LazyPatterns:
+    """Compiles each pattern on first use, which keeps importing this module cheap."""
+
+    def __getattr__(self, name):
+        pattern = re.compile(_PATTERNS[name])
+        setattr(self, name, pattern)
+        return pattern
+
+
+_patterns = _LazyPatterns()
+
+
+def _strip(text, bmp_pattern, exact_pattern):
+    text = bmp_pattern.sub('', text)
+    if _patterns.astral.search(text) is None:
+        return text
+    return exact_pattern.sub('', text)
+
+
+def script(char):
+    """Return HAN, HIRAGANA or KATAKANA for a character of those scripts, otherwise None."""
+    i = bisect_right(_STARTS, ord(char)) - 1
+    if i >= 0 and ord(char) <= _SCRIPT_RANGES[i][1]:
+        return _SCRIPT_RANGES[i][2]
+    return None
+
+
+def extract_kanji(text):
+    """Return the kanji of text in order."""
+    found = _patterns.kanji_or_astral.findall(text)
+    if found and max(found) > '\uffff':
+        return [char for char in found if char <= '\uffff' or script(char) == HAN]
+    return found
+
+
+def strip_non_kanji(text):
+    """Remove everything but kanji from text, ''.join(extract_kanji(text)) without a list of characters."""
+    return _strip(text, _patterns.non_kanji_bmp, _patterns.non_kanji)
+
+
+def strip_non_japanese(text):
+    """Remove everything but kanji and kana from text."""
+    return _strip(text, _patterns.non_japanese_bmp, _patterns.non_japanese)
+
+
+def _strip_lines(texts, bmp_pattern, exact_pattern, single):
+    # One substitution over the newline-joined texts instead of one call per text
+    lines = _strip('\n'.join(texts), bmp_pattern, exact_pattern).split('\n')
+    if len(lines) != len(texts):
+        # Some text had a newline of its own
+        return [single(text) for text in texts]
+    return lines
+
+
+def extract_kanji_batch(texts):
+    """extract_kanji() of every text."""
+    # Unlike stripping, a joined pass loses here: splitting it back into per-text
+    # lists of characters costs more than one findall per text
+    return list(map(extract_kanji, texts))
+
+
+def strip_non_japanese_batch(texts):
+    """strip_non_japanese() of every text, in one pass over all of them."""
+    return _strip_lines(list(texts), _patterns.non_japanese_line_bmp, _patterns.non_japanese_line,
+                        strip_non_japanese)
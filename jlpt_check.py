@@ -0,0 +1,128 @@
+"""`python kanji.py jlpt-check`: how much of each JLPT level's vocabulary is known in Anki."""
+import sqlite3
+
+from anki_connect import AnkiConnect, AnkiConnectError, AnkiUnreachable
+from anki_cache import KnowledgeCache
+from anki_search import tag
+from config import ANKI_CACHE
+from instrumentation import Recorder
+from jlpt_coverage import JLPT_LEVELS, KNOWN_FIELDS, build_known_index, coverage, known_flags
+from jlpt_store import load_store
+
+# Constants
+OUTPUT_DIR = "."  # Current directory for output files
+
+def get_known_cards(anki, cache):
+    """Get all cards with the 'known' tag."""
+    print("Fetching known cards from Anki...")
+    query = tag('known')
+    note_ids = anki.invoke('findNotes', query=query)
+    if not note_ids:
+        print("No cards with 'known' tag found in Anki.")
+        return []
+    
+    print(f"Found {len(note_ids)} notes with 'known' tag. Fetching details...")
+    return cache.note_records(note_ids, KNOWN_FIELDS)
+
+def check_jlpt_levels(levels, known_cards):
+    """Check how many words from each JLPT level are known."""
+    jlpt_vocab = load_store(levels=levels)
+
+    # Normalize the known cards once and check every level in a single pass
+    known_index = build_known_index(known_cards)
+    flags = known_flags(jlpt_vocab, known_index)
+
+    results = {}
+    for level, (known_rows, missing_rows) in coverage(jlpt_vocab, flags, levels).items():
+        total_words = len(known_rows) + len(missing_rows)
+        if not total_words:
+            print(f"No vocabulary found for JLPT {level.upper()}")
+            continue
+        print(f"Analyzing JLPT {level.upper()} vocabulary ({total_words} words)...")
+
+        # Calculate percentage
+        known_count = len(known_rows)
+        percentage = (known_count / total_words) * 100
+
+        # Print results
+        print(f"\nJLPT {level.upper()} Vocabulary Knowledge:")
+        print(f"Known: {known_count}/{total_words} words ({percentage:.1f}%)")
+
+        # Write missing words to file
+        output_file = f"missing_jlpt_{level}_vocab.txt"
+        with open(output_file, 'w', encoding='utf-8') as file:
+            file.write(f"Missing JLPT {level.upper()} Vocabulary ({len(missing_rows)} words):\n\n")
+            for row in missing_rows:
+                kanji = jlpt_vocab['kanji'][row]
+                kanji_part = f"{kanji} " if kanji else ""
+                file.write(f"{kanji_part}[{jlpt_vocab['kana'][row]}] - {jlpt_vocab['definition'][row]}\n")
+
+        print(f"Missing words list saved to {output_file}")
+
+        results[level] = (percentage, known_count, total_words)
+    return results
+
+def print_summary(results):
+    """Print a summary of all JLPT levels checked."""
+    if not results:
+        return
+    
+    print("\n" + "="*50)
+    print("SUMMARY OF JLPT VOCABULARY KNOWLEDGE")
+    print("="*50)
+    
+    total_known = sum(result[1] for result in results.values())
+    total_words = sum(result[2] for result in results.values())
+    overall_percentage = (total_known / total_words) * 100 if total_words > 0 else 0
+    
+    print(f"Overall: {total_known}/{total_words} words ({overall_percentage:.1f}%)\n")
+    
+    # Print a table of results for each level
+    print(f"{'Level':<10}{'Known':<15}{'Total':<15}{'Percentage':<10}")
+    print("-"*50)
+    
+    # Sort levels from N5 (easiest) to N1 (hardest)
+    for level in sorted(results.keys(), reverse=True):
+        percentage, known, total = results[level]
+        print(f"{level.upper():<10}{known:<15}{total:<15}{percentage:.1f}%")
+
+def main(args):
+    print("Checking JLPT vocabulary knowledge...")
+    print("Make sure Anki is running with the AnkiConnect add-on installed.")
+    recorder = Recorder()
+    anki = AnkiConnect(recorder=recorder)
+    cache = KnowledgeCache(anki, ANKI_CACHE)
+
+    # Check if Anki is running by making a simple request, kanji.py reports it if not
+    anki.invoke('version')
+
+    try:
+        # Get all known cards
+        with recorder.phase("known notes"):
+            known_cards = get_known_cards(anki, cache)
+        if not known_cards:
+            return
+            
+        print(f"Successfully retrieved {len(known_cards)} known cards")
+        
+        levels_to_check = JLPT_LEVELS
+        print("Checking all JLPT levels (N5-N1)...")
+        
+        # Check each JLPT level and store results
+        with recorder.phase("check levels"):
+            results = check_jlpt_levels(levels_to_check, known_cards)
+        
+        # Print summary if we checked multiple levels
+        if len(results) > 1:
+            print_summary(results)
+            
+    except AnkiUnreachable:
+        raise
+    except (AnkiConnectError, OSError, sqlite3.Error) as e:
+        # Anki refused a request, or the vocabulary lists or the cache could not be read
+        print(f"🔴 Error: {e}")
+        return 1
+    finally:
+        if args.report:
+            recorder.write(args.report)
+            print(f"📊 Report saved to {args.report}")
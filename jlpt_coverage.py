@@ -0,0 +1,124 @@
+import csv
+import re
+import unicodedata
+
+from japanese_text import strip_non_japanese, strip_non_japanese_batch
+
+JLPT_LEVELS = ["n5", "n4", "n3", "n2", "n1"]
+JLPT_VOCAB_DIR = "jlpt-vocab"
+KNOWN_FIELDS = ('Expression', 'Reading')  # The fields of known notes the check reads
+
+# Anki furigana markup: "日本[にほん]語[ご]", a space separates a base from preceding text
+FURIGANA = re.compile(r' ?([^ \[\]]+)\[([^\]]*)\]')
+KATAKANA_TO_HIRAGANA = str.maketrans({code: code - 0x60 for code in range(0x30A1, 0x30F7)})
+
+
+def normalize_japanese(text):
+    """Normalize Japanese text for better matching."""
+    # Remove any non-Japanese characters and whitespace
+    return strip_non_japanese(text)
+
+
+def canonical_key(text, reading=False):
+    """Fold text to the key used for matching: furigana stripped, full-width, hiragana, Japanese only.
+
+    With `reading` the furigana markup is replaced by its reading instead of being dropped.
+    """
+    if '[' in text:
+        text = FURIGANA.sub(r'\2' if reading else r'\1', text)
+    # Width folding comes first: the half-width voiced marks ﾞ and ﾟ are Common script and
+    # stripping would drop them, turning ｶﾞｯｺｳ into かっこう
+    return normalize_japanese(unicodedata.normalize('NFKC', text)).translate(KATAKANA_TO_HIRAGANA)
+
+
+def canonical_keys(texts, reading=False):
+    """canonical_key() of every text, folded as one newline-joined string to save per-call work."""
+    if not texts:
+        return []
+    texts = [FURIGANA.sub(r'\2' if reading else r'\1', text) if '[' in text else text for text in texts]
+    # Width folded before stripping, as in canonical_key(); NFKC leaves newlines alone so the
+    # joined text splits back into the same lines, and stripped texts have no newlines left
+    folded = unicodedata.normalize('NFKC', '\n'.join(texts)).split('\n')
+    if len(folded) != len(texts):
+        # Some text had a newline of its own
+        folded = [unicodedata.normalize('NFKC', text) for text in texts]
+    return '\n'.join(strip_non_japanese_batch(folded)).translate(KATAKANA_TO_HIRAGANA).split('\n')
+
+
+def load_jlpt_vocab(levels=JLPT_LEVELS, vocab_dir=JLPT_VOCAB_DIR):
+    """Load the JLPT vocabulary CSVs of every level once into column lists."""
+    vocab = {'level': [], 'jmdict_seq': [], 'kanji': [], 'kana': [], 'definition': []}
+    for level in levels:
+        with open(f"{vocab_dir}/{level}.csv", 'r', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                vocab['level'].append(level)
+                vocab['jmdict_seq'].append(row['jmdict_seq'])
+                vocab['kanji'].append(row['kanji'])
+                vocab['kana'].append(row['kana'])
+                vocab['definition'].append(row['waller_definition'])
+    return vocab
+
+
+def build_known_index(known_notes):
+    """Return (expressions, expressions and readings) sets of the raw and canonical known forms.
+
+    known_notes are NoteRecords of KNOWN_FIELDS.
+    """
+    expressions = []
+    readings = []
+    for note in known_notes:
+        expression, reading = note.values
+        if expression is not None:
+            expressions.append(expression)
+            # Also add the reading as some cards might be stored by reading
+            if reading is not None:
+                readings.append(reading)
+    # Furigana in an expression also gives us its reading
+    furigana = [expression for expression in expressions if '[' in expression]
+
+    known_expressions = set(expressions)
+    known_expressions.update(canonical_keys(expressions))
+    known_readings = set(readings)
+    known_readings.update(canonical_keys(readings + furigana, reading=True))
+    return known_expressions, known_expressions | known_readings
+
+
+def known_flags(vocab, known_index):
+    """Return one known/missing flag per vocab row in a single membership pass.
+
+    A row is known when its kanji form is a known expression or its kana form is a
+    known expression or reading, compared raw or by canonical key. Rows sharing a
+    jmdict_seq are variants of one word, so if one of them is known all of them are.
+    Uses the precomputed canonical_kanji/canonical_kana columns of the JLPT store
+    when present, otherwise folds each distinct string once.
+    """
+    expressions, expressions_and_readings = known_index
+    if 'canonical_kanji' in vocab:
+        canonical_kanji_column, canonical_kana_column = vocab['canonical_kanji'], vocab['canonical_kana']
+    else:
+        distinct = list(dict.fromkeys(vocab['kanji'] + vocab['kana']))
+        canonical = dict(zip(distinct, canonical_keys(distinct)))
+        canonical_kanji_column = [canonical[kanji] for kanji in vocab['kanji']]
+        canonical_kana_column = [canonical[kana] for kana in vocab['kana']]
+
+    flags = []
+    for kanji, kana, canonical_kanji, canonical_kana in zip(
+            vocab['kanji'], vocab['kana'], canonical_kanji_column, canonical_kana_column):
+        # Check if either kanji or kana form is known
+        if canonical_kanji and (canonical_kanji in expressions or kanji in expressions):
+            flags.append(True)
+        else:
+            flags.append(canonical_kana in expressions_and_readings or kana in expressions_and_readings)
+
+    known_seqs = {seq for seq, known in zip(vocab['jmdict_seq'], flags) if known and seq}
+    if known_seqs:
+        flags = [known or seq in known_seqs for seq, known in zip(vocab['jmdict_seq'], flags)]
+    return flags
+
+
+def coverage(vocab, flags, levels=JLPT_LEVELS):
+    """Group the flags by level into {level: (known rows, missing rows)}."""
+    results = {level: ([], []) for level in levels}
+    for i, (level, known) in enumerate(zip(vocab['level'], flags)):
+        results[level][0 if known else 1].append(i)
+    return results
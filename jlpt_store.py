@@ -0,0 +1,120 @@
+import hashlib
+import os
+import sqlite3
+
+from jlpt_coverage import JLPT_LEVELS, JLPT_VOCAB_DIR, canonical_keys, load_jlpt_vocab
+
+JLPT_STORE = f"{JLPT_VOCAB_DIR}/jlpt-vocab.sqlite"
+STORE_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE sources (level TEXT PRIMARY KEY, sha256 TEXT NOT NULL);
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    jmdict_seq TEXT NOT NULL,  -- empty for the few words without a JMdict entry
+    kanji TEXT NOT NULL,
+    kana TEXT NOT NULL,
+    canonical_kanji TEXT NOT NULL,
+    canonical_kana TEXT NOT NULL,
+    levels INTEGER NOT NULL  -- bit i set when the word is in JLPT_LEVELS[i]
+);
+CREATE TABLE level_rows (
+    level TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    entry_id INTEGER NOT NULL REFERENCES entries (id),
+    definition TEXT NOT NULL,
+    PRIMARY KEY (level, position)
+);
+"""
+
+
+def source_hashes(levels=JLPT_LEVELS, vocab_dir=JLPT_VOCAB_DIR):
+    """Return {level: sha256 of its CSV}, used to tell when the store is stale."""
+    hashes = {}
+    for level in levels:
+        with open(f"{vocab_dir}/{level}.csv", 'rb') as file:
+            hashes[level] = hashlib.sha256(file.read()).hexdigest()
+    return hashes
+
+
+def build_store(store_file=JLPT_STORE, levels=JLPT_LEVELS, vocab_dir=JLPT_VOCAB_DIR):
+    """Normalize the JLPT CSVs once and write them to a SQLite store."""
+    vocab = load_jlpt_vocab(levels, vocab_dir)
+    entries = {}
+    level_rows = []
+    positions = {level: 0 for level in levels}
+    for level, seq, kanji, kana, definition in zip(
+            vocab['level'], vocab['jmdict_seq'], vocab['kanji'], vocab['kana'], vocab['definition']):
+        key = (seq, kanji, kana)
+        if key not in entries:
+            entries[key] = [len(entries) + 1, 0]
+        entries[key][1] |= 1 << JLPT_LEVELS.index(level)
+        level_rows.append((level, positions[level], entries[key][0], definition))
+        positions[level] += 1
+
+    temp_file = f"{store_file}.tmp"
+    if os.path.exists(temp_file):
+        os.remove(temp_file)
+    db = sqlite3.connect(temp_file)
+    try:
+        db.executescript(SCHEMA)
+        db.execute(f'PRAGMA user_version = {STORE_VERSION}')
+        db.executemany('INSERT INTO sources VALUES (?, ?)', source_hashes(levels, vocab_dir).items())
+        canonical_kanji = canonical_keys([kanji for _, kanji, _ in entries])
+        canonical_kana = canonical_keys([kana for _, _, kana in entries])
+        db.executemany('INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)', [
+            (entry_id, seq, kanji, kana, canonical_kanji[i], canonical_kana[i], level_bits)
+            for i, ((seq, kanji, kana), (entry_id, level_bits)) in enumerate(entries.items())
+        ])
+        db.executemany('INSERT INTO level_rows VALUES (?, ?, ?, ?)', level_rows)
+        db.commit()
+    except BaseException:
+        db.close()
+        os.remove(temp_file)
+        raise
+    db.close()
+    os.replace(temp_file, store_file)
+
+
+def _is_current(store_file, vocab_dir):
+    if not os.path.exists(store_file):
+        return False
+    try:
+        db = sqlite3.connect(store_file)
+        try:
+            version = db.execute('PRAGMA user_version').fetchone()[0]
+            hashes = dict(db.execute('SELECT level, sha256 FROM sources'))
+        finally:
+            db.close()
+    except sqlite3.DatabaseError:
+        return False
+    return version == STORE_VERSION and hashes == source_hashes(JLPT_LEVELS, vocab_dir)
+
+
+def load_store(store_file=JLPT_STORE, levels=JLPT_LEVELS, vocab_dir=JLPT_VOCAB_DIR):
+    """Load the JLPT vocabulary columns of levels, rebuilding the store first if any CSV changed."""
+    # The store always holds every level and levels only filters what is read, so
+    # loading a few levels neither rebuilds it nor leaves out the others
+    if not _is_current(store_file, vocab_dir):
+        build_store(store_file, JLPT_LEVELS, vocab_dir)
+    columns = ('jmdict_seq', 'kanji', 'kana', 'definition', 'canonical_kanji', 'canonical_kana')
+    vocab = {'level': []}
+    vocab.update((column, []) for column in columns)
+    db = sqlite3.connect(store_file)
+    try:
+        for level in levels:
+            rows = db.execute(
+                f'SELECT {", ".join(columns)} '
+                'FROM level_rows JOIN entries ON entries.id = level_rows.entry_id '
+                'WHERE level = ? ORDER BY position', (level,)).fetchall()
+            vocab['level'].extend([level] * len(rows))
+            for column, values in zip(columns, zip(*rows)):
+                vocab[column].extend(values)
+    finally:
+        db.close()
+    return vocab
+
+
+if __name__ == "__main__":
+    build_store()
+    print(f"Built {JLPT_STORE} successfully.")
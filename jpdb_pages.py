@@ -0,0 +1,210 @@
+"""Pull the keyword, mnemonic and meaning out of jpdb.io pages without building a full tree.
+
+A streaming HTMLParser follows the page's elements the way BeautifulSoup's html.parser
+tree builder nests them, without creating any objects for them, and stops as soon as
+the elements it is after are complete. Only those elements, a few hundred bytes out
+of a page of tens of kilobytes, are then handed to BeautifulSoup, so the text and
+markup returned are exactly what a BeautifulSoup parse of the whole page gives.
+benchmarks/jpdb-pages.py checks this on saved pages.
+"""
+from html.parser import HTMLParser
+
+# Elements BeautifulSoup's html.parser builder closes right after their start tag
+VOID_ELEMENTS = frozenset({
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr', 'image', 'img',
+    'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track', 'wbr',
+})
+
+
+class _Done(Exception):
+    pass
+
+
+class Element:
+    __slots__ = ('name', 'attrs', 'start', 'end')
+
+    def __init__(self, name, attrs, start):
+        self.name = name
+        self.attrs = attrs
+        self.start = start
+        self.end = None
+
+    def has_class(self, name):
+        return name in self.attrs.get('class', '').split()
+
+
+class ElementScanner(HTMLParser):
+    """Reports where elements start and end, nesting them like BeautifulSoup's html.parser builder.
+
+    Subclasses override started() and closed(), and call done() to stop scanning.
+    Element.start and Element.end are offsets into the scanned text.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.open = []
+        self.closed_void = []
+
+    def scan(self, html):
+        self.html = html
+        self.line_starts = [0]
+        position = html.find('\n')
+        while position != -1:
+            self.line_starts.append(position + 1)
+            position = html.find('\n', position + 1)
+        try:
+            self.feed(html)
+            self.close()
+            # Whatever is still open ends with the page
+            for element in reversed(self.open):
+                element.end = len(html)
+                self.closed(element)
+        except _Done:
+            pass
+
+    def done(self):
+        raise _Done
+
+    def started(self, element):
+        pass
+
+    def closed(self, element):
+        pass
+
+    def _offset(self):
+        line, column = self.getpos()
+        return self.line_starts[line - 1] + column
+
+    def _start(self, tag, attrs):
+        start = self._offset()
+        element = Element(tag, {name: value or '' for name, value in attrs}, start)
+        self.started(element)
+        return element, start + len(self.get_starttag_text())
+
+    def handle_starttag(self, tag, attrs):
+        element, end = self._start(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self.closed_void.append(tag)
+            element.end = end
+            self.closed(element)
+        else:
+            self.open.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        element, element.end = self._start(tag, attrs)
+        self.closed(element)
+
+    def handle_endtag(self, tag):
+        if tag in self.closed_void:
+            # </br> after <br>, which was closed already
+            self.closed_void.remove(tag)
+            return
+        for i in range(len(self.open) - 1, -1, -1):
+            if self.open[i].name == tag:
+                break
+        else:
+            return  # Nothing of that name is open, BeautifulSoup ignores it too
+        start = self._offset()
+        end = self.html.find('>', start) + 1 or len(self.html)
+        # Elements left open inside it end where it ends
+        for element in reversed(self.open[i + 1:]):
+            element.end = start
+            self.closed(element)
+        element = self.open[i]
+        del self.open[i:]
+        element.end = end
+        self.closed(element)
+
+
+def _soup(html, element):
+    # Imported on first use so commands that never parse a page don't load it
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html[element.start:element.end], 'html.parser').find(element.name)
+
+
+class KanjiPageScanner(ElementScanner):
+    """Finds the first div after the first <h6>Keyword</h6>, and the first div.mnemonic."""
+
+    def __init__(self):
+        super().__init__()
+        self.headings = {}  # Open h6 elements and the first div started after each
+        self.heading_found = False
+        self.waiting = False  # The heading was found but no div started after it yet
+        self.keyword_div = None
+        self.keyword = None
+        self.keyword_found = False
+        self.mnemonic_div = None
+        self.mnemonic = None
+
+    def started(self, element):
+        if element.name == 'h6' and not self.heading_found:
+            self.headings[element] = None
+        elif element.name == 'div':
+            for heading, div in self.headings.items():
+                if div is None:
+                    self.headings[heading] = element
+            if self.waiting:
+                self.keyword_div, self.waiting = element, False
+            if self.mnemonic_div is None and element.has_class('mnemonic'):
+                self.mnemonic_div = element
+
+    def closed(self, element):
+        if element in self.headings:
+            div = self.headings.pop(element)
+            # Cheap check first, most headings on the page are something else
+            if 'Keyword' in self.html[element.start:element.end] and _soup(self.html, element).string == "Keyword":
+                self.heading_found = True
+                self.headings.clear()
+                self.keyword_div, self.waiting = div, div is None
+                if div is not None and div.end is not None:
+                    self._found_keyword(div)  # The div was inside the heading
+        if element is self.keyword_div:
+            self._found_keyword(element)
+        if element is self.mnemonic_div:
+            self.mnemonic = _soup(self.html, element).decode_contents().strip()
+        if self.keyword_found and self.mnemonic is not None:
+            self.done()
+
+    def _found_keyword(self, element):
+        self.keyword = _soup(self.html, element).text
+        self.keyword_found = True
+
+
+class SearchPageScanner(ElementScanner):
+    """Finds the first div.description inside the first div.subsection-meanings."""
+
+    def __init__(self):
+        super().__init__()
+        self.meanings = None
+        self.description_div = None
+        self.description = ""
+
+    def started(self, element):
+        if element.name != 'div':
+            return
+        if self.meanings is None:
+            if element.has_class('subsection-meanings'):
+                self.meanings = element
+        elif self.description_div is None and element.has_class('description'):
+            self.description_div = element
+
+    def closed(self, element):
+        if element is self.description_div:
+            self.description = _soup(self.html, element).text.strip()
+            self.done()
+        if element is self.meanings:
+            self.done()
+
+
+def parse_kanji_page(html):
+    """Return [keyword, mnemonic HTML] of a jpdb.io kanji page, None for what it doesn't have."""
+    scanner = KanjiPageScanner()
+    scanner.scan(html)
+    return [scanner.keyword, scanner.mnemonic]
+
+
+def parse_search_page(html):
+    """Return the first meaning of the first result of a jpdb.io search page, "" if there is none."""
+    scanner = SearchPageScanner()
+    scanner.scan(html)
+    return scanner.description
@@ -0,0 +1,105 @@
+import json
+import re
+
+READ_SIZE = 1024 * 1024
+MAX_VALUE_SIZE = 64 * 1024 * 1024  # Largest single card we are willing to buffer
+# Top-level arrays of the JPDB export we read, and the field that names each card
+SECTIONS = {
+    'cards_vocabulary_jp_en': 'spelling',
+    'cards_kanji_keyword_char': 'character',
+}
+
+NON_WHITESPACE = re.compile(r'\S')
+DELIMITER = re.compile(r'[,\]}\s]')
+DECODER = json.JSONDecoder()
+
+
+class _Reader:
+    """Incremental JSON reader over a text file that only buffers the value being decoded."""
+
+    def __init__(self, file):
+        self.file = file
+        self.buf = ''
+        self.pos = 0
+
+    def more(self):
+        chunk = self.file.read(READ_SIZE)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            match = NON_WHITESPACE.search(self.buf, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buf[self.pos]
+            self.pos = len(self.buf)
+            if not self.more():
+                raise ValueError('unexpected end of JSON data')
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected '{char}', found '{self.buf[self.pos]}'")
+        self.pos += 1
+
+    def decode(self):
+        """Decode the next complete value, reading more of the file until it is buffered."""
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if len(self.buf) - self.pos < MAX_VALUE_SIZE and self.more():
+                    continue
+                raise
+            # A number with no delimiter after it may continue in the next chunk
+            number = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if number and not DELIMITER.match(self.buf, end) and self.more():
+                continue
+            self.pos = end
+            return value
+
+    def items(self):
+        """Yield the elements of the array at the current position one at a time."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            if self.peek() != ',':
+                break
+            self.pos += 1
+        self.expect(']')
+
+
+def iter_review_cards(file_path):
+    """Yield (section, name, tag) for every vocab and kanji card in a JPDB reviews.json export.
+
+    The file is read in chunks and top-level arrays are decoded one card at a time,
+    so memory use does not grow with the size of the export. `tag` is 'known' if any
+    review was graded easy, otherwise 'new'.
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        reader = _Reader(file)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.decode()
+            reader.expect(':')
+            if reader.peek() == '[':
+                field = SECTIONS.get(key)
+                for card in reader.items():
+                    if field:
+                        tag = 'known' if any(review['grade'] == 'easy' for review in card['reviews']) else 'new'
+                        yield key, card[field], tag
+            else:
+                reader.decode()
+            if reader.peek() != ',':
+                break
+            reader.pos += 1
+        reader.expect('}')
@@ -0,0 +1,200 @@
+import json
+import sqlite3
+import threading
+import time
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import JPDB_CACHE
+from instrumentation import payload_sizes
+from jpdb_pages import parse_kanji_page, parse_search_page
+
+JPDB_URL = "https://jpdb.io"
+CACHE_TTL = 30 * 24 * 60 * 60  # Seconds before a cached page is fetched again
+MAX_WORKERS = 4
+REQUESTS_PER_SECOND = 2.0  # Per host
+MAX_RETRIES = 4
+BACKOFF = 1.0  # Seconds, doubled on every retry
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+"""
+
+
+class RateLimiter:
+    """Spaces out requests to the same host across all worker threads."""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def wait(self, host):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+PAGES = {
+    'kanji': (lambda character: f"/kanji/{urllib.parse.quote(character)}", parse_kanji_page),
+    'search': (lambda word: f"/search?q={urllib.parse.quote(word)}", parse_search_page),
+}
+
+
+class JPDBScraper:
+    """Fetches and parses jpdb.io pages concurrently, keeping parsed results in an on-disk cache.
+
+    Results are cached per (page kind, character/word) for `ttl` seconds. Failed
+    fetches are not cached and come back as None. Fetches, including their retries
+    and rate limit waits, and parsing are accounted to `recorder` if given.
+    """
+
+    def __init__(self, base_url=JPDB_URL, cache_path=JPDB_CACHE, ttl=CACHE_TTL,
+                 max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND,
+                 max_retries=MAX_RETRIES, backoff=BACKOFF, session=None, recorder=None):
+        self.base_url = base_url.rstrip('/')
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._session = session
+        self._session_lock = threading.Lock()
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.recorder = recorder
+        self.db = sqlite3.connect(cache_path)
+        self.db.executescript(SCHEMA)
+
+    @property
+    def session(self):
+        with self._session_lock:
+            if self._session is None:
+                # Imported on the first fetch, runs served from the cache never load it
+                import requests
+                self._session = requests.Session()
+            return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    def _cached(self, kind, key):
+        row = self.db.execute(
+            'SELECT fetched_at, data FROM pages WHERE kind = ? AND key = ?', (kind, key)
+        ).fetchone()
+        if row and (self.ttl is None or time.time() - row[0] < self.ttl):
+            return json.loads(row[1])
+        return None
+
+    def _store(self, results):
+        now = time.time()
+        self.db.executemany('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)', [
+            (kind, key, now, json.dumps(data, ensure_ascii=False))
+            for (kind, key), data in results.items() if data is not None
+        ])
+        self.db.commit()
+
+    def _get(self, url):
+        import requests
+        host = urllib.parse.urlsplit(url).netloc
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait(host)
+            delay = self.backoff * 2 ** attempt
+            try:
+                response = self.session.get(url, timeout=30)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+            time.sleep(delay)
+
+    def _fetch(self, kind, key):
+        import requests
+        path, parse = PAGES[kind]
+        url = self.base_url + path(key)
+        if self.recorder is not None:
+            self.recorder.count('jpdb.io', kind)
+        start = time.perf_counter()
+        try:
+            response = self._get(url)
+        except requests.exceptions.RequestException as e:
+            print(f"🟡 Warning: Failed to fetch data for '{key}': {e}")
+            return None
+        if self.recorder is not None:
+            self.recorder.record('jpdb.io', kind, time.perf_counter() - start, *payload_sizes(response))
+        if response.status_code != 200:
+            print(f"🟡 Warning: Failed to fetch data for '{key}', status code: {response.status_code}")
+            return None
+        start = time.perf_counter()
+        data = parse(response.text)
+        if self.recorder is not None:
+            self.recorder.record('parse', kind, time.perf_counter() - start)
+        return data
+
+    def iter_fetch(self, kind, keys, window=None):
+        """Yield (key, parsed page) for keys as they become available, cached pages first.
+
+        At most `window` fetches (twice the workers by default) are in flight, so a
+        consumer that falls behind holds the fetching back instead of piling up pages.
+        """
+        window = window or 2 * self.max_workers
+        missing = []
+        for key in dict.fromkeys(keys):
+            cached = self._cached(kind, key)
+            if cached is None:
+                missing.append(key)
+            else:
+                if self.recorder is not None:
+                    self.recorder.count('cache', kind)
+                yield key, cached
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            waiting = iter(missing)
+            running = {}
+            while True:
+                for key in waiting:
+                    running[pool.submit(self._fetch, kind, key)] = key
+                    if len(running) >= window:
+                        break
+                if not running:
+                    return
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                fetched = {running.pop(future): future.result() for future in done}
+                self._store({(kind, key): data for key, data in fetched.items()})
+                yield from fetched.items()
+
+    def fetch_all(self, kind, keys):
+        """Return {key: parsed page} for keys, fetching cache misses on a thread pool."""
+        return dict(self.iter_fetch(kind, keys))
+
+    def fetch(self, kind, key):
+        return self.fetch_all(kind, [key])[key]
+
+    def get_keywords_and_mnemonics(self, characters):
+        """Return {character: [keyword, mnemonic]}, with None for anything not found."""
+        return {character: data or [None, None] for character, data in self.fetch_all('kanji', characters).items()}
+
+    def get_keyword_and_mnemonic(self, character):
+        return self.get_keywords_and_mnemonics([character])[character]
+
+    def get_descriptions(self, words):
+        """Return {word: description}, with None when the page could not be fetched."""
+        return self.fetch_all('search', words)
+
+    def get_description(self, word):
+        return self.get_descriptions([word])[word]
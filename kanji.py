@@ -0,0 +1,104 @@
+"""One entry point for the scripts of this repository.
+
+    python kanji.py update [--dry-run | --apply PLAN | --daemon] [--report FILE]
+    python kanji.py import-jpdb [--reviews reviews.json] [--report FILE]
+    python kanji.py jlpt-check [--report FILE]
+    python kanji.py study-priority [--report FILE]
+    python kanji.py corpus FILE... [--jobs N]
+    python kanji.py build-krad [--force]
+
+Each command lives in its own module, imported only when that command runs, and
+requests and BeautifulSoup are imported on first use. Startup is kept within
+STARTUP_BUDGET_MS, see benchmarks/startup.py.
+"""
+import argparse
+import importlib
+import sys
+
+from anki_connect import AnkiUnreachable
+from config import DEEP_RADICALS, KNOWN_INTERVAL, POLL_INTERVAL
+
+STARTUP_BUDGET_MS = 50  # Import time of any command, on top of the interpreter's own startup
+PLAN_FILE = "update-plan.json"
+REVIEWS = "reviews.json"
+CORPUS_OUTPUT = "corpus-kanji.tsv"
+
+# Command: (module with its main(args), description)
+COMMANDS = {
+    'update': ('update_cards', "Add kanji and radical cards for new vocab and unlock cards whose dependencies are known."),
+    'import-jpdb': ('import_jpdb', "Create kanji and radical notes for the cards of a jpdb.io reviews.json export."),
+    'jlpt-check': ('jlpt_check', "Report how much of each JLPT level's vocabulary is known."),
+    'study-priority': ('study_priority', "List the radicals and kanji that unlock the most locked cards."),
+    'corpus': ('corpus_coverage', "Count the kanji of Japanese text files and show which are known and what they are missing."),
+    'build-krad': (None, "Build the kanji to radicals artifacts from the KRADFILE sources."),
+}
+REPORTED = ('update', 'import-jpdb', 'jlpt-check', 'study-priority')  # Commands taking --report
+DEEP = ('update', 'study-priority', 'corpus')  # Commands taking --deep-radicals
+
+
+def build_krad(args):
+    from kanjitoradical.krad_build import build
+    if not build(force=args.force, accept_changes=args.accept_changes, jobs=args.jobs):
+        return 1
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description="Kanji and radical cards for Anki, unlocked as their dependencies become known.")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+    parsers = {name: commands.add_parser(name, help=description, description=description)
+               for name, (_, description) in COMMANDS.items()}
+    for command in parsers.values():
+        command.set_defaults(parser=command)
+    for name in DEEP:
+        parsers[name].add_argument('--deep-radicals', action=argparse.BooleanOptionalAction, default=DEEP_RADICALS,
+                                   help="make kanji wait on every component at any depth, not only the radicals "
+                                        f"their note lists (default: {'on' if DEEP_RADICALS else 'off'})")
+    for name in REPORTED:
+        parsers[name].add_argument('--report', metavar='FILE',
+                                   help="save the requests, actions and time of every phase to FILE as JSON")
+
+    update = parsers['update']
+    update.add_argument('--dry-run', action='store_true', help="only work out the changes and save them to the plan file")
+    update.add_argument('--plan', default=PLAN_FILE, help=f"plan file written by --dry-run (default: {PLAN_FILE})")
+    update.add_argument('--apply', metavar='PLAN', help="apply a plan saved by --dry-run instead of planning a new one")
+    update.add_argument('--daemon', action='store_true', help="keep running and apply changes as they show up in Anki")
+    update.add_argument('--interval', type=float, default=POLL_INTERVAL,
+                        help=f"seconds between checks in --daemon mode, send SIGUSR1 to check now (default: {POLL_INTERVAL})")
+    update.add_argument('--known-interval', type=int, default=KNOWN_INTERVAL, metavar='DAYS',
+                        help=f"interval a new card needs to count as known (default: {KNOWN_INTERVAL})")
+    update.add_argument('--profile', metavar='FILE', help="save a cProfile dump of the run to FILE")
+
+    parsers['import-jpdb'].add_argument('--reviews', default=REVIEWS,
+                                        help=f"reviews export downloaded from jpdb.io (default: {REVIEWS})")
+
+    corpus = parsers['corpus']
+    corpus.add_argument('files', nargs='+', metavar='FILE', help="UTF-8 text files, any size")
+    corpus.add_argument('--jobs', type=int, help="counting processes (default: one per CPU)")
+    corpus.add_argument('--output', default=CORPUS_OUTPUT, help=f"TSV of every kanji (default: {CORPUS_OUTPUT})")
+    corpus.add_argument('--no-anki', action='store_true', help="only count, without asking Anki what is known")
+
+    build = parsers['build-krad']
+    build.add_argument('--force', action='store_true', help="rebuild even if the sources are unchanged")
+    build.add_argument('--accept-changes', action='store_true',
+                       help="write the result even if it removes or changes kanji of the current JSON")
+    build.add_argument('--jobs', type=int, help="parser processes, one per source by default")
+    return parser
+
+
+def main(argv=None):
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'update' and args.daemon and (args.dry_run or args.apply):
+        args.parser.error("--daemon can't be combined with --dry-run or --apply")
+
+    module = COMMANDS[args.command][0]
+    run = importlib.import_module(module).main if module else build_krad
+    try:
+        return run(args)
+    except AnkiUnreachable:
+        print("🔴 Error: Could not connect to Anki. Please make sure Anki is running and AnkiConnect is installed.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
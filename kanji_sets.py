@@ -0,0 +1,35 @@
+def map_kanji_and_radicals(kanji_list, kanji_data, tags=None):
+    """Return {kanji: {"radicals": [...]}} for kanji_list, with its "tag" from tags ({kanji: tag}) if given."""
+    mapped_data = {}
+    for kanji in kanji_list:
+        radicals = kanji_data.get(kanji, [])
+        radicals = [radical for radical in radicals if radical != kanji]
+
+        mapped_data[kanji] = {
+            "radicals": radicals
+        }
+        if tags is not None:
+            mapped_data[kanji]["tag"] = tags.get(kanji, "")
+    return mapped_data
+
+
+def create_sets(data):
+    """Split mapped kanji into ({kanji: details}, {radical: {"tag": tag}}).
+
+    A kanji without radicals is a radical itself and keeps its tag, the radicals of
+    other kanji get an empty one.
+    """
+    kanji_set = {}
+    radical_set = {}
+
+    for kanji, details in data.items():
+        radicals = details.get("radicals", [])
+
+        if not radicals:
+            radical_set[kanji] = {"tag": details.get("tag", "")}
+        else:
+            kanji_set[kanji] = details
+            for radical in radicals:
+                radical_set.setdefault(radical, {"tag": ""})
+
+    return kanji_set, radical_set
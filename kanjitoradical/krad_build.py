@@ -0,0 +1,159 @@
+"""Build the kanji to radicals artifacts from the KRADFILE sources.
+
+Every source is decoded and parsed line by line in its own process, the results
+are merged in source order, checked against the current kradfile-combined.json
+and written out as kradfile-combined, kradfile-combined.json,
+kradfile-combined.idx and kradfile-closure.idx, the table of every component
+each kanji is built from at any depth. Nothing is rebuilt when the sources have not changed
+since the last build.
+"""
+import codecs
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from .krad_closure import write_closure
+    from .krad_index import write_index
+except ImportError:
+    # Imported from a script run inside this directory
+    from krad_closure import write_closure
+    from krad_index import write_index
+
+KRAD_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCES = ["kradfile", "kradfile2"]  # Merge order: earlier sources win ties
+COMBINED_FILE = "kradfile-combined"
+OUTPUT_FILE = "kradfile-combined.json"
+INDEX_FILE = "kradfile-combined.idx"
+CLOSURE_FILE = "kradfile-closure.idx"
+MANIFEST_FILE = "kradfile-build.json"
+# The EDRDG distributes KRADFILE in EUC-JP, the copies in this repository are UTF-8
+ENCODINGS = ("utf-8", "euc-jp")
+READ_SIZE = 64 * 1024
+
+
+def file_hash(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(READ_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _decoded_lines(path, encoding):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(READ_SIZE), b''):
+            lines = (pending + decoder.decode(chunk)).split('\n')
+            pending = lines.pop()
+            yield from lines
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def parse_source(path):
+    """Return (encoding, [(kanji, radicals)]) of one KRADFILE, trying each of ENCODINGS."""
+    for encoding in ENCODINGS:
+        entries = []
+        try:
+            for number, line in enumerate(_decoded_lines(path, encoding), 1):
+                # Skip comments and empty lines
+                if line.startswith('#') or not line.strip():
+                    continue
+                kanji, separator, radicals = line.partition(':')
+                kanji = kanji.strip()
+                if not separator or len(kanji) != 1:
+                    raise ValueError(f"{path}:{number}: malformed line {line!r}")
+                entries.append((kanji, radicals.split()))
+        except UnicodeDecodeError:
+            continue
+        return encoding, entries
+    raise ValueError(f"{path}: not encoded in any of {', '.join(ENCODINGS)}")
+
+
+def merge(parsed_sources):
+    """Merge the entries of every source in order, deduplicating radicals by first appearance."""
+    kanji_to_radicals = {}
+    for entries in parsed_sources:
+        for kanji, radicals in entries:
+            merged = kanji_to_radicals.setdefault(kanji, [])
+            merged.extend(radical for radical in dict.fromkeys(radicals) if radical not in merged)
+    return kanji_to_radicals
+
+
+def compare(previous, current):
+    """Return (added, removed, changed) kanji between two mappings."""
+    added = [kanji for kanji in current if kanji not in previous]
+    removed = [kanji for kanji in previous if kanji not in current]
+    changed = [kanji for kanji in current if kanji in previous and previous[kanji] != current[kanji]]
+    return added, removed, changed
+
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _replace(path, write):
+    # Write next to the target and swap it in, so a failed build never leaves half a file
+    temp_path = f"{path}.tmp"
+    write(temp_path)
+    os.replace(temp_path, path)
+
+
+def _write_text(path, text):
+    with open(path, 'w', encoding='utf-8', newline='\n') as file:
+        file.write(text)
+
+
+def build(directory=KRAD_DIR, sources=SOURCES, force=False, accept_changes=False, jobs=None):
+    """Rebuild the artifacts in directory if needed. Returns False when validation failed."""
+    paths = [os.path.join(directory, source) for source in sources]
+    outputs = {name: os.path.join(directory, name) for name in (COMBINED_FILE, OUTPUT_FILE, INDEX_FILE, CLOSURE_FILE)}
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+
+    source_hashes = {source: file_hash(path) for source, path in zip(sources, paths)}
+    manifest = load_manifest(manifest_path)
+    if not force and manifest and manifest['sources'] == source_hashes and all(
+            os.path.exists(path) and file_hash(path) == manifest['outputs'].get(name)
+            for name, path in outputs.items()):
+        print("🟢 KRADFILE artifacts are up to date.")
+        return True
+
+    with ProcessPoolExecutor(max_workers=jobs or len(paths)) as executor:
+        parsed = list(executor.map(parse_source, paths))
+    for source, (encoding, entries) in zip(sources, parsed):
+        print(f"📝 Parsed {len(entries)} kanji from {source} ({encoding})")
+    kanji_to_radicals = merge(entries for _, entries in parsed)
+
+    if os.path.exists(outputs[OUTPUT_FILE]):
+        with open(outputs[OUTPUT_FILE], 'r', encoding='utf-8') as file:
+            previous = json.load(file)
+        added, removed, changed = compare(previous, kanji_to_radicals)
+        if added or removed or changed:
+            print(f"🟡 Changes against {OUTPUT_FILE}: {len(added)} added, {len(removed)} removed, "
+                  f"{len(changed)} changed")
+            for label, kanji_list in (("Removed", removed), ("Changed", changed)):
+                if kanji_list:
+                    print(f"   {label}: {''.join(kanji_list[:50])}{'…' if len(kanji_list) > 50 else ''}")
+            if (removed or changed) and not accept_changes:
+                print("🔴 Not writing anything, rerun with --accept-changes to keep these changes.")
+                return False
+
+    combined = ''.join(f"{kanji} : {' '.join(radicals)}\n" for kanji, radicals in kanji_to_radicals.items())
+    _replace(outputs[COMBINED_FILE], lambda path: _write_text(path, combined))
+    _replace(outputs[OUTPUT_FILE], lambda path: _write_text(
+        path, json.dumps(kanji_to_radicals, ensure_ascii=False, indent=4)))
+    _replace(outputs[INDEX_FILE], lambda path: write_index(kanji_to_radicals, path))
+    _replace(outputs[CLOSURE_FILE], lambda path: write_closure(kanji_to_radicals, path))
+    output_hashes = {name: file_hash(path) for name, path in outputs.items()}
+    _replace(manifest_path, lambda path: _write_text(
+        path, json.dumps({'sources': source_hashes, 'outputs': output_hashes}, indent=4) + '\n'))
+    print(f"🟢 Wrote {len(kanji_to_radicals)} kanji to {', '.join(outputs)} successfully.")
+    return True
@@ -0,0 +1,241 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+# Layout: header, sorted kanji codepoints (uint32), one `width` byte bitset per
+# kanji with the bit of every component reachable from it, the bitset of the
+# leaf components, the groups of variants as newline separated UTF-8 (口囗\n母毋)
+# and the components as newline separated UTF-8. Everything is little-endian
+# whatever the machine that built it.
+MAGIC = b'KRCL'
+VERSION = 2
+HEADER = struct.Struct('<4sIIIII')  # magic, version, n_kanji, width, n_radicals, groups size
+
+# Relative to the repository root, where the scripts run
+KRAD_CLOSURE = "kanjitoradical/kradfile-closure.idx"
+
+
+def _components(kanji_to_radicals):
+    """Return {component: bit} in order of first appearance."""
+    ids = {}
+    for radicals in kanji_to_radicals.values():
+        for radical in radicals:
+            ids.setdefault(radical, len(ids))
+    return ids
+
+
+def closure_masks(kanji_to_radicals):
+    """Return ({component: bit}, {kanji: bitset of every component reachable from it}, leaf bitset, groups).
+
+    Components that are kanji themselves are decomposed again. Each strongly
+    connected group (口 and 囗 list each other) is resolved once, after every
+    group it leads to, so every kanji is visited once however deep or cyclic
+    the decomposition. The members of a group are variants of one radical: the
+    closure of a member leaves the whole group out, so 品 is built from 口 but
+    not from 囗. Leaves are the components that lead nowhere outside their own
+    group. groups lists the groups of more than one member.
+    """
+    ids = _components(kanji_to_radicals)
+    bits = {kanji: 1 << bit for kanji, bit in ids.items()}
+    masks = {}
+    leaves = 0
+    groups = []
+    # Iterative Tarjan, groups come out after all the groups they lead to
+    order, low, stack, on_stack = {}, {}, [], set()
+    for root in kanji_to_radicals:
+        if root in order:
+            continue
+        work = [(root, iter(kanji_to_radicals[root]))]
+        order[root] = low[root] = len(order)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            kanji, children = work[-1]
+            for child in children:
+                if child not in kanji_to_radicals:
+                    continue  # A plain radical, nothing below it
+                if child not in order:
+                    order[child] = low[child] = len(order)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(kanji_to_radicals[child])))
+                    break
+                if child in on_stack:
+                    low[kanji] = min(low[kanji], order[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[kanji])
+                if low[kanji] != order[kanji]:
+                    continue
+                group = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    group.append(member)
+                    if member == kanji:
+                        break
+                mask = 0
+                for member in group:
+                    for radical in kanji_to_radicals[member]:
+                        mask |= bits[radical] | masks.get(radical, 0)
+                group_mask = 0
+                for member in group:
+                    group_mask |= bits.get(member, 0)
+                for member in group:
+                    masks[member] = mask & ~group_mask
+                if not mask & ~group_mask:
+                    leaves |= group_mask
+                if len(group) > 1:
+                    groups.append(''.join(sorted(group, key=ord)))
+    for radical, bit in bits.items():
+        if radical not in kanji_to_radicals:
+            leaves |= bit
+    return ids, masks, leaves, groups
+
+
+def pack_closure(kanji_to_radicals):
+    """Return the binary closure table of a kanji -> radicals mapping."""
+    ids, masks, leaves, groups = closure_masks(kanji_to_radicals)
+    width = (len(ids) + 7) // 8
+    kanji = sorted(masks, key=ord)
+    codepoints = array('I', (ord(character) for character in kanji))
+    if sys.byteorder == 'big':
+        codepoints.byteswap()
+    rows = b''.join(masks[character].to_bytes(width, 'little') for character in kanji)
+    groups = '\n'.join(sorted(groups)).encode('utf-8')
+    return b''.join([
+        HEADER.pack(MAGIC, VERSION, len(kanji), width, len(ids), len(groups)),
+        codepoints.tobytes(),
+        rows,
+        leaves.to_bytes(width, 'little'),
+        groups,
+        '\n'.join(ids).encode('utf-8'),
+    ])
+
+
+def write_closure(kanji_to_radicals, output_file):
+    """Write the transitive closure of a kanji -> radicals mapping as a binary table."""
+    with open(output_file, 'wb') as file:
+        file.write(pack_closure(kanji_to_radicals))
+
+
+class RadicalClosure:
+    """Read-only view of a radical closure table.
+
+    Every kanji maps to a bitset of all the components it is built from at any
+    depth, so finding the full prerequisites of a kanji is one bisect and one
+    int.from_bytes, and set operations between kanji are integer &, | and ~.
+    """
+
+    def __init__(self, buffer, name="buffer"):
+        self.buffer = buffer
+        magic, version, n_kanji, self.width, n_radicals, groups_size = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{name} is not a version {VERSION} radical closure table")
+
+        view = memoryview(buffer)
+        start = HEADER.size
+        self.codepoints = view[start:start + 4 * n_kanji].cast('I')
+        if sys.byteorder == 'big':
+            self.codepoints = array('I', self.codepoints.tobytes())
+            self.codepoints.byteswap()
+        start += 4 * n_kanji
+        self.rows = view[start:start + self.width * n_kanji]
+        start += self.width * n_kanji
+        self.leaf_mask = int.from_bytes(view[start:start + self.width], 'little')
+        start += self.width
+        groups = bytes(view[start:start + groups_size]).decode('utf-8').split('\n') if groups_size else []
+        start += groups_size
+        self.radicals = bytes(view[start:]).decode('utf-8').split('\n') if n_radicals else []
+        self.ids = {radical: bit for bit, radical in enumerate(self.radicals)}
+        # {member: bitset of the other variants in its group}
+        self.variants = {}
+        for group in groups:
+            group_mask = self.mask(group)
+            for member in group:
+                self.variants[member] = group_mask & ~self.mask([member])
+
+    @classmethod
+    def open(cls, closure_file):
+        with open(closure_file, 'rb') as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), closure_file)
+
+    @classmethod
+    def from_mapping(cls, kanji_to_radicals):
+        return cls(pack_closure(kanji_to_radicals), "mapping")
+
+    def _position(self, kanji):
+        if len(kanji) != 1:
+            return -1
+        codepoint = ord(kanji)
+        position = bisect_left(self.codepoints, codepoint)
+        if position < len(self.codepoints) and self.codepoints[position] == codepoint:
+            return position
+        return -1
+
+    def closure_mask(self, kanji):
+        """Bitset of every component of kanji at any depth, 0 if it has none."""
+        position = self._position(kanji)
+        if position < 0:
+            return 0
+        return int.from_bytes(self.rows[position * self.width:(position + 1) * self.width], 'little')
+
+    def mask(self, radicals):
+        """Bitset of the given components, ignoring the ones the table does not know."""
+        mask = 0
+        for radical in radicals:
+            bit = self.ids.get(radical)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def radicals_of(self, mask):
+        """The components of a bitset, in table order."""
+        radicals = []
+        while mask:
+            low = mask & -mask
+            radicals.append(self.radicals[low.bit_length() - 1])
+            mask ^= low
+        return radicals
+
+    def get(self, kanji, default=None):
+        """Every component of kanji at any depth, or default if it is not in the table."""
+        if self._position(kanji) < 0:
+            return default
+        return self.radicals_of(self.closure_mask(kanji))
+
+    def leaves(self, kanji):
+        """The components of kanji that are not decomposed any further."""
+        return self.radicals_of(self.closure_mask(kanji) & self.leaf_mask)
+
+    def expand(self, radicals, exclude=None):
+        """The given components followed by everything they are built from, without exclude.
+
+        Variants of a given component (口 for 囗) are left out, whatever path leads
+        to them. Components the table does not know are kept as they are.
+        """
+        radicals = [radical for radical in dict.fromkeys(radicals) if radical != exclude]
+        hidden = self.mask(radicals) | self.mask([exclude]) | self.variants.get(exclude, 0)
+        deeper = 0
+        for radical in radicals:
+            deeper |= self.closure_mask(radical)
+            hidden |= self.variants.get(radical, 0)
+        return radicals + self.radicals_of(deeper & ~hidden)
+
+    def __contains__(self, kanji):
+        return self._position(kanji) >= 0
+
+    def __len__(self):
+        return len(self.codepoints)
+
+
+def load_radical_closure(kanji_data, closure_file=KRAD_CLOSURE):
+    """Return the closure table of kanji_data, from the built file if there is one, else computed now."""
+    if os.path.exists(closure_file):
+        return RadicalClosure.open(closure_file)
+    return RadicalClosure.from_mapping({kanji: kanji_data[kanji] for kanji in kanji_data.keys()})
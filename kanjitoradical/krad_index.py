@@ -0,0 +1,127 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+# Layout: header, sorted kanji codepoints (uint32), per-kanji offsets into the
+# radical id array (uint32, n_kanji + 1), radical ids (uint16, padded to 4 bytes)
+# and finally the interned radicals as newline separated UTF-8.
+MAGIC = b'KRAD'
+VERSION = 1
+HEADER = struct.Struct('<4sIIIII')  # magic, version, byte order, n_kanji, n_refs, n_radicals
+BYTE_ORDERS = {'little': 0, 'big': 1}
+
+# Relative to the repository root, where the scripts run
+KRADFILE = "kanjitoradical/kradfile-combined.json"
+KRAD_INDEX = "kanjitoradical/kradfile-combined.idx"
+
+
+def write_index(kanji_to_radicals, output_file):
+    """Write a kanji -> radicals mapping as a compact binary index."""
+    radical_ids = {}
+    kanji = sorted(kanji_to_radicals, key=ord)
+    codepoints = array('I', (ord(character) for character in kanji))
+    offsets = array('I', [0])
+    refs = array('H')
+    for character in kanji:
+        for radical in kanji_to_radicals[character]:
+            refs.append(radical_ids.setdefault(radical, len(radical_ids)))
+        offsets.append(len(refs))
+    if len(refs) % 2:
+        refs.append(0)
+    radicals = '\n'.join(radical_ids).encode('utf-8')
+
+    with open(output_file, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDERS[sys.byteorder],
+                               len(codepoints), offsets[-1], len(radical_ids)))
+        file.write(codepoints.tobytes())
+        file.write(offsets.tobytes())
+        file.write(refs.tobytes())
+        file.write(radicals)
+
+
+class KradIndex:
+    """Read-only view of a binary KRADFILE index.
+
+    Lookups bisect the memory-mapped kanji table and decode only the radicals
+    of the requested kanji, so loading the index does not build a dict of lists.
+    """
+
+    def __init__(self, index_file):
+        with open(index_file, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byte_order, n_kanji, n_refs, n_radicals = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{index_file} is not a version {VERSION} KRADFILE index")
+
+        view = memoryview(self.buffer)
+        start = HEADER.size
+        self.codepoints = self._array(view, start, 'I', n_kanji, byte_order)
+        start += 4 * n_kanji
+        self.offsets = self._array(view, start, 'I', n_kanji + 1, byte_order)
+        start += 4 * (n_kanji + 1)
+        self.refs = self._array(view, start, 'H', n_refs, byte_order)
+        start += 2 * (n_refs + n_refs % 2)
+        self.radicals = bytes(view[start:]).decode('utf-8').split('\n') if n_radicals else []
+
+    @staticmethod
+    def _array(view, start, typecode, length, byte_order):
+        size = array(typecode).itemsize
+        data = view[start:start + size * length]
+        if byte_order == BYTE_ORDERS[sys.byteorder]:
+            return data.cast(typecode)
+        swapped = array(typecode, data.tobytes())
+        swapped.byteswap()
+        return swapped
+
+    def _position(self, kanji):
+        if len(kanji) != 1:
+            return -1
+        codepoint = ord(kanji)
+        position = bisect_left(self.codepoints, codepoint)
+        if position < len(self.codepoints) and self.codepoints[position] == codepoint:
+            return position
+        return -1
+
+    def get(self, kanji, default=None):
+        position = self._position(kanji)
+        if position < 0:
+            return default
+        radicals = self.radicals
+        return [radicals[ref] for ref in self.refs[self.offsets[position]:self.offsets[position + 1]]]
+
+    def __getitem__(self, kanji):
+        radicals = self.get(kanji)
+        if radicals is None:
+            raise KeyError(kanji)
+        return radicals
+
+    def __contains__(self, kanji):
+        return self._position(kanji) >= 0
+
+    def __len__(self):
+        return len(self.codepoints)
+
+    def __iter__(self):
+        return (chr(codepoint) for codepoint in self.codepoints)
+
+    def keys(self):
+        return iter(self)
+
+
+def load_kanji_data(json_file=KRADFILE, index_file=KRAD_INDEX):
+    """Return the kanji -> radicals mapping, from the binary index if it was built, else from the JSON."""
+    if os.path.exists(index_file):
+        return KradIndex(index_file)
+    try:
+        with open(json_file, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        print(f"🔴 Error: {json_file} not found.")
+        return {}
+    except json.JSONDecodeError:
+        print(f"🔴 Error: {json_file} is not a valid JSON file.")
+        return {}
@@ -1,30 +1,23 @@
-import json
+"""Build kradfile-combined, kradfile-combined.json, kradfile-combined.idx and kradfile-closure.idx from the KRADFILE sources.
 
-def convert_text_to_json(input_file, output_file):
-    """Convert kanji-radicals text file to JSON format."""
-    kanji_to_radicals = {}
-    try:
-        with open(input_file, 'r', encoding='utf-8') as file:
-            for line in file:
-                # Skip empty lines
-                if line.strip():
-                    # Split the line by ':' to separate kanji from radicals
-                    if ':' in line:
-                        kanji, radicals = line.split(':')
-                        # Remove whitespace and split radicals into a list
-                        kanji_to_radicals[kanji.strip()] = radicals.strip().split()
-        # Write the dictionary to a JSON file
-        with open(output_file, 'w', encoding='utf-8') as json_file:
-            json.dump(kanji_to_radicals, json_file, ensure_ascii=False, indent=4)
-        print(f"Converted {input_file} to {output_file} successfully.")
-    except FileNotFoundError:
-        print(f"Error: {input_file} not found.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    python kradfile-to-json.py [--force] [--accept-changes] [--jobs N]
+"""
+import argparse
+import sys
 
-# File paths
-input_file = "kradfile-combined"  # Replace with your text file name
-output_file = "kradfile-combined.json"  # Output JSON file name
+from krad_build import build
 
-# Convert the file
-convert_text_to_json(input_file, output_file)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the kanji to radicals artifacts from the KRADFILE sources.")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the sources are unchanged")
+    parser.add_argument('--accept-changes', action='store_true',
+                        help="write the result even if it removes or changes kanji of the current JSON")
+    parser.add_argument('--jobs', type=int, help="parser processes, one per source by default")
+    args = parser.parse_args()
+    if not build(force=args.force, accept_changes=args.accept_changes, jobs=args.jobs):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
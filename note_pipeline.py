@@ -0,0 +1,112 @@
+"""Create notes for characters while their jpdb.io pages are still being fetched.
+
+create_notes() runs the three stages of card creation at the same time:
+
+1. One existence search for all characters, `Character:一 or Character:二 ...`
+2. Fetching the pages of the missing characters on the scraper's worker threads
+3. A writer thread sending the finished notes to Anki in batches of `addNote` actions inside `multi`
+
+The stages are joined by bounded queues, so the scraper pauses when Anki falls
+behind and only a few pages are fetched ahead of the notes they end up in.
+"""
+import queue
+import threading
+import time
+
+import anki_search
+
+EXISTS_CHUNK_SIZE = 500  # Characters per findNotes search
+ADD_NOTES_BATCH = 50
+FLUSH_INTERVAL = 2.0  # Seconds a started batch waits for more notes before it is sent
+QUEUE_SIZE = 200  # Notes waiting for Anki before scraping pauses
+
+
+def existing_characters(anki, characters, field="Character", chunk_size=EXISTS_CHUNK_SIZE):
+    """Return the characters that already have a note, with one search per chunk_size characters."""
+    characters = list(dict.fromkeys(characters))
+    if not characters:
+        return set()
+    queries = [{'query': ' or '.join(anki_search.field(field, character) for character in characters[start:start + chunk_size])}
+               for start in range(0, len(characters), chunk_size)]
+    note_ids = [note_id for found in anki.invoke_all("findNotes", queries) for note_id in found]
+    if not note_ids:
+        return set()
+    wanted = set(characters)
+    return {note['fields'][field]['value'] for note in anki.invoke("notesInfo", notes=note_ids)
+            if field in note.get('fields', {}) and note['fields'][field]['value'] in wanted}
+
+
+class _Writer(threading.Thread):
+    """Sends the notes put on `notes` to Anki in batches until it gets None."""
+
+    def __init__(self, anki, batch_size, flush_interval, queue_size):
+        super().__init__(daemon=True)
+        self.anki = anki
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.notes = queue.Queue(maxsize=queue_size)
+        self.added = []
+        self.failed = []
+        self.error = None
+
+    def _next_batch(self):
+        batch = [self.notes.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while batch[-1] is not None and len(batch) < self.batch_size:
+            try:
+                batch.append(self.notes.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self._next_batch()
+            notes = [note for note in batch if note is not None]
+            if notes and self.error is None:
+                # One addNote per note: addNotes fails the whole batch over a single duplicate
+                pending = [self.anki.queue("addNote", note=note) for note in notes]
+                try:
+                    self.anki.flush()
+                except Exception as e:
+                    # Keep draining so the producer never blocks on a full queue
+                    self.error = e
+                else:
+                    for note, result in zip(notes, pending):
+                        added = result.error is None and result.value is not None
+                        (self.added if added else self.failed).append(note)
+            if batch[-1] is None:
+                return
+
+
+def create_notes(anki, scraper, data, make_note, batch_size=ADD_NOTES_BATCH,
+                 flush_interval=FLUSH_INTERVAL, queue_size=QUEUE_SIZE):
+    """Create a note for every character of data that doesn't have one yet.
+
+    make_note(character, details, page) builds the note from the data entry and the
+    parsed jpdb.io kanji page, which is None when the page could not be fetched.
+    Returns (notes added, notes Anki refused).
+    """
+    total = len(data)
+    existing = existing_characters(anki, data)
+    for character in data:
+        if character in existing:
+            print(f"Skipping {character} as it already exists.")
+    missing = [character for character in data if character not in existing]
+
+    writer = _Writer(anki, batch_size, flush_interval, queue_size)
+    writer.start()
+    try:
+        for current, (character, page) in enumerate(scraper.iter_fetch('kanji', missing), len(existing) + 1):
+            if writer.error is not None:
+                break
+            print(f"[{current}/{total}] Processing {character}...")
+            writer.notes.put(make_note(character, data[character], page))
+    finally:
+        writer.notes.put(None)
+        writer.join()
+    if writer.error is not None:
+        raise writer.error
+    for note in writer.failed:
+        print(f"🟡 Warning: Anki did not add the note for {note['fields'].get('Character')}")
+    return writer.added, writer.failed
@@ -0,0 +1,7 @@
+"""Same as `python kanji.py study-priority`, kept so existing cron jobs and habits keep working."""
+import sys
+
+from kanji import main
+
+if __name__ == "__main__":
+    sys.exit(main(['study-priority', *sys.argv[1:]]))
@@ -0,0 +1,63 @@
+"""`python kanji.py study-priority`: the radicals and kanji that unlock the most locked cards once known."""
+from anki_connect import AnkiConnect
+from anki_cache import KnowledgeCache
+from anki_search import all_of, negate, note_type, tag
+from config import ANKI_CACHE, KANJI_NOTE_TYPE, VOCAB_NOTE_TYPE
+from unlock_index import UnlockIndex
+from dependency_graph import parse_dependencies
+from instrumentation import Recorder
+from kanjitoradical.krad_closure import load_radical_closure
+from kanjitoradical.krad_index import load_kanji_data
+
+TOP_N = 20
+
+def get_notes(anki, cache, query, fields):
+    return cache.note_records(anki.invoke('findNotes', query=query), fields)
+
+def get_known_characters(anki, cache):
+    characters = set()
+    # Vocab notes have no Character, leaving them out of the search spares downloading them
+    for note in get_notes(anki, cache, all_of(tag('known'), negate(note_type(VOCAB_NOTE_TYPE))), ['Character']):
+        character, = note.values
+        if character is not None:
+            characters.add(character)
+    return characters
+
+def build_index(anki, cache, locked_type, dependency_type, known_characters, expand=None):
+    """UnlockIndex of the locked notes of locked_type, widened by expand(dependencies, character) if given."""
+    index = UnlockIndex(known_characters)
+    for note in get_notes(anki, cache, all_of(tag('locked'), note_type(locked_type)), [dependency_type, 'Character']):
+        dependencies, character = note.values
+        dependencies = parse_dependencies(dependencies or '')
+        if expand is not None:
+            dependencies = expand(dependencies, character)
+        index.add(note.note_id, dependencies)
+    return index
+
+def print_ranking(title, index, unlocked_type):
+    print(f"\n{title}")
+    print(f"{'Character':<12}{'Unlocks':<10}{'Waiting':<10}")
+    print("-"*32)
+    for dependency, unlocks, blocks in index.rank(TOP_N):
+        print(f"{dependency:<12}{unlocks:<10}{blocks:<10}")
+    print(f"{len(index.unlockable)} locked {unlocked_type} can already be unlocked by running `python kanji.py update`")
+
+def main(args):
+    recorder = Recorder()
+    anki = AnkiConnect(recorder=recorder)
+    cache = KnowledgeCache(anki, ANKI_CACHE)
+    try:
+        with recorder.phase("known characters"):
+            known_characters = get_known_characters(anki, cache)
+        with recorder.phase("kanji index"):
+            # Kanji wait on what `kanji.py update` makes them wait on
+            expand = load_radical_closure(load_kanji_data()).expand if args.deep_radicals else None
+            kanji_index = build_index(anki, cache, KANJI_NOTE_TYPE, 'Radicals', known_characters, expand)
+        with recorder.phase("vocab index"):
+            vocab_index = build_index(anki, cache, VOCAB_NOTE_TYPE, 'Kanji', known_characters)
+    finally:
+        if args.report:
+            recorder.write(args.report)
+            print(f"📊 Report saved to {args.report}")
+    print_ranking("📚 Radicals that unlock the most locked kanji", kanji_index, 'kanji')
+    print_ranking("📚 Kanji that unlock the most locked vocab", vocab_index, 'vocab')
@@ -0,0 +1,56 @@
+from collections import defaultdict
+
+
+class UnlockIndex:
+    """Inverted dependency -> locked items index with per-item missing counters.
+
+    Marking a dependency as known only touches the items waiting on it, so the
+    unlockable set is kept up to date without rescanning every locked item.
+    """
+
+    def __init__(self, known=()):
+        self.known = set(known)
+        self.dependencies = {}
+        self.waiting_on = defaultdict(set)
+        self.missing = {}
+        self.unlockable = set()
+
+    def add(self, item, dependencies):
+        """Register a locked item and the characters it depends on."""
+        self.dependencies[item] = tuple(dependencies)
+        missing = set(dependencies) - self.known
+        self.missing[item] = len(missing)
+        for dependency in missing:
+            self.waiting_on[dependency].add(item)
+        if not missing:
+            self.unlockable.add(item)
+
+    def mark_known(self, dependency):
+        """Mark a dependency as known and return the items it made unlockable."""
+        if dependency in self.known:
+            return set()
+        self.known.add(dependency)
+        unlocked = set()
+        for item in self.waiting_on.pop(dependency, ()):
+            self.missing[item] -= 1
+            if self.missing[item] == 0:
+                unlocked.add(item)
+        self.unlockable |= unlocked
+        return unlocked
+
+    def missing_dependencies(self, item):
+        return [dependency for dependency in self.dependencies[item] if dependency not in self.known]
+
+    def rank(self, top=None):
+        """Rank unknown dependencies by how many locked items learning them would unlock.
+
+        Returns (dependency, unlocks, blocks) tuples, where `unlocks` counts the items
+        for which the dependency is the last one missing and `blocks` counts every
+        item still waiting on it.
+        """
+        ranking = []
+        for dependency, items in self.waiting_on.items():
+            unlocks = sum(1 for item in items if self.missing[item] == 1)
+            ranking.append((dependency, unlocks, len(items)))
+        ranking.sort(key=lambda entry: (-entry[1], -entry[2], entry[0]))
+        return ranking[:top] if top else ranking
@@ -0,0 +1,147 @@
+"""`python kanji.py update`: add kanji and radical cards for new vocab and unlock cards whose dependencies are known."""
+import json
+import os
+
+from anki_cache import KnowledgeCache
+from anki_connect import AnkiConnect, AnkiConnectError, AnkiUnreachable
+from config import (ANKI_CACHE, CHECKPOINT_FILE, DEEP_RADICALS, JPDB_CACHE, KANJI_DECK, KANJI_NOTE_TYPE,
+                    KNOWN_INTERVAL, RADICAL_NOTE_TYPE, VOCAB_NOTE_TYPE)
+from instrumentation import Recorder
+from kanjitoradical.krad_closure import load_radical_closure
+from kanjitoradical.krad_index import load_kanji_data
+from update_daemon import UpdateDaemon
+from update_plan import apply_plan, build_plan, fetch_snapshot, load_checkpoint, save_json
+
+CONFIG = {
+    'kanji_deck': KANJI_DECK,
+    'vocab_note_type': VOCAB_NOTE_TYPE,
+    'kanji_note_type': KANJI_NOTE_TYPE,
+    'radical_note_type': RADICAL_NOTE_TYPE,
+    'layers': {KANJI_NOTE_TYPE: 'Radicals', VOCAB_NOTE_TYPE: 'Kanji'},
+    'known_interval': KNOWN_INTERVAL,
+    'deep_radicals': DEEP_RADICALS,
+}
+
+
+class Clients:
+    """The AnkiConnect client, note cache and jpdb.io scraper of a run, accounted to one recorder."""
+
+    def __init__(self, recorder=None):
+        self.recorder = recorder or Recorder()
+        self.anki = AnkiConnect(recorder=self.recorder)
+        self.cache = KnowledgeCache(self.anki, ANKI_CACHE)
+        self._scraper = None
+
+    @property
+    def scraper(self):
+        # Created when the first new kanji or radical needs its page, most runs have none
+        if self._scraper is None:
+            from jpdb_scraper import JPDBScraper
+            self._scraper = JPDBScraper(cache_path=JPDB_CACHE, recorder=self.recorder)
+        return self._scraper
+
+    def get_keywords_and_mnemonics(self, characters):
+        return self.scraper.get_keywords_and_mnemonics(characters)
+
+
+def load_closure(kanji_data, config):
+    """The RadicalClosure build_plan() needs with config['deep_radicals'], else None."""
+    return load_radical_closure(kanji_data) if config['deep_radicals'] else None
+
+
+def create_plan(clients, config=CONFIG):
+    with clients.recorder.phase("snapshot"):
+        snapshot = fetch_snapshot(clients.anki, clients.cache, config)
+    print(f"🈳 Checking {len(snapshot['missing_kanji_notes'])} notes with missing kanji, "
+          f"{len(snapshot['new'])} new cards past {config['known_interval']} days "
+          f"and {len(snapshot['locked'])} locked cards...")
+    with clients.recorder.phase("plan"):
+        kanji_data = load_kanji_data()
+        return build_plan(snapshot, kanji_data, clients.get_keywords_and_mnemonics, config,
+                          load_closure(kanji_data, config))
+
+
+def print_summary(summary):
+    if summary['vocab_updated'] > 0:
+        print(f"🟢 Updated {summary['vocab_updated']} vocab notes with kanji!")
+    else:
+        print(f"No notes need kanji added")
+    if summary['vocab_without_kanji_unlocked'] > 0:
+        print(f"🔓 {summary['vocab_without_kanji_unlocked']} notes without kanji unlocked!")
+    if summary['kanji_created'] > 0:
+        print(f"🟢 Created {summary['kanji_created']} new kanji cards!")
+    if summary['radicals_created'] > 0:
+        print(f"🟢 Created {summary['radicals_created']} new radical cards!")
+    if summary['known'] > 0:
+        print(f"✅ {summary['known']} cards moved to known")
+    else:
+        print(f"📝 No new cards known. Keep studying!")
+    for note_type, count in summary['unlocked'].items():
+        if count > 0:
+            print(f"🔓 {count} {note_type} cards unlocked!")
+        else:
+            print(f"📝 No {note_type} cards to unlock. Keep studying!")
+
+def main(args):
+    clients = Clients()
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        run(args, clients)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"📊 Profile saved to {args.profile}")
+        if args.report:
+            clients.recorder.write(args.report)
+            print(f"📊 Report saved to {args.report}")
+
+def run(args, clients):
+    print("This script will evaluate your ANKI collection and make sure that it has\nall the correct kanji and radicals needed to learn new vocab words. Make\nsure you let it run to completion so it doesn't leave any cards partially\ncomplete.\n")
+    print("🚀 Off we go!")
+    anki, recorder = clients.anki, clients.recorder
+    config = dict(CONFIG, known_interval=args.known_interval, deep_radicals=args.deep_radicals)
+
+    checkpoint = load_checkpoint(CHECKPOINT_FILE)
+    if checkpoint and not args.dry_run:
+        print(f"⏯️  Resuming an interrupted run ({len(checkpoint['done'])}/{len(checkpoint['plan']['actions'])} changes already applied)...")
+        try:
+            with recorder.phase("resume"):
+                apply_plan(anki, checkpoint['plan'], CHECKPOINT_FILE)
+        except AnkiUnreachable:
+            raise
+        except AnkiConnectError as e:
+            # Planning again from what is in Anki now supersedes the interrupted plan
+            print(f"🔴 Could not finish the interrupted run: {e}")
+
+    if args.daemon:
+        print(f"👀 Watching Anki for changes every {args.interval:g} seconds (pid {os.getpid()}), Ctrl+C to stop")
+        kanji_data = load_kanji_data()
+        daemon = UpdateDaemon(anki, clients.cache, kanji_data, clients.get_keywords_and_mnemonics,
+                              config, CHECKPOINT_FILE, recorder, load_closure(kanji_data, config))
+        try:
+            daemon.run(args.interval, on_plan=lambda plan: print_summary(plan['summary']))
+        except KeyboardInterrupt:
+            print("👋 Stopped watching")
+        return
+
+    if args.apply:
+        with open(args.apply, 'r', encoding='utf-8') as file:
+            plan = json.load(file)
+    else:
+        plan = create_plan(clients, config)
+    print_summary(plan['summary'])
+
+    if args.dry_run:
+        save_json(plan, args.plan)
+        print(f"📝 Dry run: {len(plan['actions'])} changes saved to {args.plan}, nothing was changed in Anki")
+        return
+
+    with recorder.phase("apply"):
+        apply_plan(anki, plan, CHECKPOINT_FILE)
+    print("🔐 Suspended all locked cards")
+    print("🎉 Updates are completed. Don't forget to run this script on a regular cadence to unlock new cards!")
@@ -0,0 +1,91 @@
+import signal
+import threading
+import time
+from contextlib import nullcontext
+
+from anki_connect import AnkiConnectError
+from config import CHECKPOINT_FILE, POLL_INTERVAL
+from update_plan import apply_plan, build_plan, fetch_snapshot
+
+
+class UpdateDaemon:
+    """Keeps `kanji.py update` resident and applies changes as they show up in Anki.
+
+    The KRADFILE index, the note/card cache, the JPDB page cache and the AnkiConnect
+    session stay warm between cycles. A cycle reads the snapshot through the cache
+    and only plans and applies when it differs from the state left by the last cycle.
+    The phases of every cycle are accounted to `recorder` if given.
+    """
+
+    def __init__(self, anki, cache, kanji_data, get_keywords_and_mnemonics, config,
+                 checkpoint_file=CHECKPOINT_FILE, recorder=None, closure=None):
+        self.anki = anki
+        self.cache = cache
+        self.kanji_data = kanji_data
+        self.get_keywords_and_mnemonics = get_keywords_and_mnemonics
+        self.config = config
+        self.checkpoint_file = checkpoint_file
+        self.recorder = recorder
+        self.closure = closure
+        self.state = None
+        self.wake = threading.Event()
+
+    def _phase(self, name):
+        return self.recorder.phase(name) if self.recorder is not None else nullcontext()
+
+    def _read(self):
+        """Return the current snapshot, its key and whether the cache had to download anything."""
+        downloads = self.cache.downloads
+        with self._phase("snapshot"):
+            snapshot = fetch_snapshot(self.anki, self.cache, self.config)
+        key = (snapshot['new'], snapshot['known'], snapshot['locked'], snapshot['deck_characters'],
+               [note['noteId'] for note in snapshot['missing_kanji_notes']])
+        return snapshot, key, self.cache.downloads != downloads
+
+    def cycle(self):
+        """Plan and apply the changes since the last cycle. Returns the applied plans, empty if nothing changed."""
+        snapshot, key, downloaded = self._read()
+        # A note or card downloaded again was edited, otherwise only the searches can differ
+        if not downloaded and key == self.state:
+            return []
+        plans = []
+        while True:
+            with self._phase("plan"):
+                plan = build_plan(snapshot, self.kanji_data, self.get_keywords_and_mnemonics, self.config,
+                                  self.closure)
+            with self._phase("apply"):
+                apply_plan(self.anki, plan, self.checkpoint_file)
+            plans.append(plan)
+            # Read back our own changes now so the next cycle only reacts to new ones
+            snapshot, self.state, _ = self._read()
+            # Cards unlocked just now may already be past the known interval, a cron run
+            # would pick them up next time so go again straight away
+            if not any(plan['summary']['unlocked'].values()) and not plan['summary']['vocab_without_kanji_unlocked']:
+                return plans
+
+    def trigger(self, *_):
+        """Run the next cycle now instead of at the end of the interval."""
+        self.wake.set()
+
+    def run(self, interval=POLL_INTERVAL, on_plan=None):
+        """Cycle every interval seconds, or on SIGUSR1, until interrupted."""
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, self.trigger)
+        while True:
+            start = time.perf_counter()
+            try:
+                plans = self.cycle()
+            except (AnkiConnectError, OSError) as e:
+                # Anki may just be closed, try again next time
+                print(f"🔴 Update failed: {e}")
+            else:
+                elapsed = (time.perf_counter() - start) * 1000
+                if not plans:
+                    print(f"💤 No changes in Anki ({elapsed:.0f} ms)")
+                for plan in plans:
+                    if on_plan:
+                        on_plan(plan)
+                if plans:
+                    print(f"🟢 Applied {sum(len(plan['actions']) for plan in plans)} changes ({elapsed:.0f} ms)")
+            self.wake.wait(interval)
+            self.wake.clear()
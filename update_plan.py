@@ -0,0 +1,293 @@
+import hashlib
+import json
+import os
+
+from anki_connect import AnkiConnectError
+from anki_search import all_of, deck, field, negate, note_type, prop, state, tag
+from config import CHECKPOINT_FILE, KNOWN_INTERVAL
+from dependency_graph import DependencyGraph, card_character, parse_dependencies
+from japanese_text import extract_kanji_batch
+from kanji_sets import create_sets, map_kanji_and_radicals
+
+APPLY_CHUNK_SIZE = 250
+APPLY_ATTEMPTS = 3  # Applies an action may fail, across replans, before the checkpoint is dropped
+DUPLICATE_NOTE_ERROR = "cannot create note because it is a duplicate"
+
+
+def fetch_snapshot(anki, cache, config):
+    """Read everything the planner needs from Anki into one JSON-serializable dict.
+
+    Only the new cards old enough to become known and the known kanji and radicals
+    are asked for, the planner has no use for the rest of the new and known cards.
+    Notes and cards only carry the fields the planner reads.
+    """
+    known_interval = config.get('known_interval', KNOWN_INTERVAL)
+    missing_kanji_ids = anki.invoke('findNotes', query=all_of(
+        note_type(config['vocab_note_type']), field('Kanji'), tag('locked')))
+    deck_note_ids = anki.invoke('findNotes', query=deck(config['kanji_deck']))
+    new_cards, known_kanji, known_radicals, locked_cards = anki.invoke_all('findCards', [
+        {'query': all_of(tag('new'), prop('ivl', '>=', known_interval))},
+        {'query': all_of(tag('known'), note_type(config['kanji_note_type']))},
+        {'query': all_of(tag('known'), note_type(config['radical_note_type']))},
+        {'query': tag('locked')},
+    ])
+    known_cards = known_kanji + known_radicals
+    deck_characters = {
+        record.values[0] for record in cache.note_records(deck_note_ids, ['Character']) if record.values[0] is not None
+    }
+    # Cards carry only the fields the dependency graph reads
+    card_fields = ['Character', *dict.fromkeys(config['layers'].values())]
+    return {
+        'missing_kanji_notes': cache.note_data(missing_kanji_ids, ['Expression']),
+        'deck_characters': sorted(deck_characters),
+        'cards': cache.card_data(list(dict.fromkeys(new_cards + known_cards + locked_cards)), card_fields),
+        'new': new_cards,
+        'known': known_cards,
+        'locked': locked_cards,
+    }
+
+
+def build_plan(snapshot, kanji_data, get_keywords_and_mnemonics, config, closure=None):
+    """Work out every change a run of `kanji.py update` makes, without talking to Anki.
+
+    With a RadicalClosure (config['deep_radicals']), radical notes are also created
+    for the components of the radicals of new and locked kanji at any depth, and
+    kanji only unlock once all of those are known.
+    Returns {'summary': {...}, 'actions': [...]} where each action is an AnkiConnect
+    action with its params. Actions that carry a `cards_query` instead of card ids
+    are resolved when the plan is applied, after the notes they depend on exist.
+    """
+    cards = {card['cardId']: card for card in snapshot['cards']}
+    new, known, locked = list(snapshot['new']), list(snapshot['known']), list(snapshot['locked'])
+    actions = []
+    summary = {}
+
+    # Step 1: fill in the Kanji field of vocab notes and unlock the ones without kanji
+    notes_to_unlock = []
+    notes_to_lock = []
+    kanji_set = set()
+    missing_kanji_notes = snapshot['missing_kanji_notes']
+    expressions = [note['fields']['Expression']['value'] for note in missing_kanji_notes]
+    for note, kanji_list in zip(missing_kanji_notes, extract_kanji_batch(expressions)):
+        note_id = note['noteId']
+        if not kanji_list:
+            notes_to_unlock.append(note)
+            continue
+        kanji_set.update(kanji_list)
+        new_kanji = ", ".join(kanji_list)
+        actions.append({'action': 'updateNoteFields', 'params': {'note': {"id": note_id, "fields": {"Kanji": new_kanji}}}})
+        for card_id in note['cards']:
+            if card_id in cards:
+                card = cards[card_id] = dict(cards[card_id])
+                card['fields'] = dict(card['fields'], Kanji={'value': new_kanji})
+        if "known" not in note['tags'] and "new" not in note['tags']:
+            notes_to_lock.append(note_id)
+    if notes_to_lock:
+        actions.append({'action': 'addTags', 'params': {'notes': notes_to_lock, 'tags': "locked"}})
+    if notes_to_unlock:
+        unlocked_cards = [card_id for note in notes_to_unlock for card_id in note['cards']]
+        actions.append({'action': 'replaceTags', 'params': {
+            'notes': [note['noteId'] for note in notes_to_unlock], 'replace_with_tag': 'new', 'tag_to_replace': 'locked'}})
+        actions.append({'action': 'unsuspend', 'params': {'cards': unlocked_cards}})
+        unlocked = set(unlocked_cards)
+        locked = [card_id for card_id in locked if card_id not in unlocked]
+        new += unlocked_cards
+    summary['vocab_updated'] = len(snapshot['missing_kanji_notes']) - len(notes_to_unlock)
+    summary['vocab_without_kanji_unlocked'] = len(notes_to_unlock)
+
+    # Step 2: create the kanji and radical notes that don't exist yet
+    kanji_and_radicals = map_kanji_and_radicals(sorted(kanji_set), kanji_data)
+    kanji_map, radicals = create_sets(kanji_and_radicals)
+    radical_set = set(radicals)
+    if closure is not None:
+        # Kanji wait on what their radicals are built from too, locked kanji already in the
+        # deck included, so notes are created for those components as well
+        listed = [(character, details['radicals']) for character, details in kanji_map.items()]
+        for card_id in locked:
+            card = cards.get(card_id)
+            if card is not None and card['modelName'] == config['kanji_note_type']:
+                listed.append((card_character(card), parse_dependencies(card['fields']['Radicals']['value'])))
+        for character, radicals in listed:
+            radical_set.update(closure.expand(radicals, character))
+    existing = set(snapshot['deck_characters'])
+    new_kanji = [character for character in kanji_map if character not in existing]
+    new_radicals = sorted(radical_set - existing - set(new_kanji))
+    keywords = get_keywords_and_mnemonics(new_kanji + new_radicals) if new_kanji or new_radicals else {}
+
+    kanji_notes = {}
+    for character in new_kanji:
+        keyword, mnemonic = keywords.get(character) or (None, None)
+        kanji_notes[character] = {
+            "deckName": config['kanji_deck'],
+            "modelName": config['kanji_note_type'],
+            "fields": {
+                "Character": character,
+                "Keyword": keyword or "",
+                "Mnemonic": mnemonic or "",
+                "Radicals": ", ".join(kanji_map[character]["radicals"])
+            },
+            "tags": ["kanji", "locked"]
+        }
+        # Stand-in card so the graph can tell whether the new kanji is unlocked straight away
+        placeholder = f'new:{character}'
+        cards[placeholder] = {
+            'cardId': placeholder,
+            'note': placeholder,
+            'modelName': config['kanji_note_type'],
+            'interval': 0,
+            'fields': {'Character': {'value': character}, 'Radicals': {'value': kanji_notes[character]['fields']['Radicals']}},
+        }
+        locked.append(placeholder)
+    radical_notes = []
+    for character in new_radicals:
+        keyword, mnemonic = keywords.get(character) or (None, None)
+        radical_notes.append({
+            "deckName": config['kanji_deck'],
+            "modelName": config['radical_note_type'],
+            "fields": {
+                "Character": character,
+                "Keyword": keyword or "",
+                "Mnemonic": mnemonic or "",
+            },
+            "tags": ["radical", "new"]
+        })
+
+    # Step 3: move new cards to known and unlock kanji and vocab whose dependencies are known
+    expand = {config['kanji_note_type']: closure.expand} if closure is not None else None
+    graph = DependencyGraph(config['layers'], config.get('known_interval', KNOWN_INTERVAL), expand)
+    graph.build([cards[card_id] for card_id in dict.fromkeys(new + known + locked) if card_id in cards], new, known, locked)
+    changes = graph.propagate()
+    unlocked_cards = changes['unlocked_cards']
+    for card_id in unlocked_cards.get(config['kanji_note_type'], []):
+        if isinstance(card_id, str):
+            # New kanji whose radicals are all known are created unlocked
+            kanji_notes[card_character(cards[card_id])]['tags'] = ["kanji", "new"]
+    unlocked_notes = [note_id for note_id in changes['unlocked_notes'] if not isinstance(note_id, str)]
+    # The stand-in cards of new kanji are created unlocked rather than unsuspended
+    unsuspended = {note_type: [card_id for card_id in card_ids if not isinstance(card_id, str)]
+                   for note_type, card_ids in unlocked_cards.items()}
+
+    actions.extend({'action': 'addNote', 'params': {'note': note}} for note in kanji_notes.values())
+    actions.extend({'action': 'addNote', 'params': {'note': note}} for note in radical_notes)
+    summary['kanji_created'] = len(kanji_notes)
+    summary['radicals_created'] = len(radical_notes)
+
+    if changes['known_notes']:
+        actions.append({'action': 'replaceTags', 'params': {
+            'notes': changes['known_notes'], 'replace_with_tag': 'known', 'tag_to_replace': 'new'}})
+    if unlocked_notes:
+        actions.append({'action': 'replaceTags', 'params': {
+            'notes': unlocked_notes, 'replace_with_tag': 'new', 'tag_to_replace': 'locked'}})
+        actions.append({'action': 'unsuspend', 'params': {'cards': [
+            card_id for card_ids in unsuspended.values() for card_id in card_ids]}})
+    summary['known'] = len(changes['known_cards'])
+    summary['unlocked'] = {note_type: len(card_ids) for note_type, card_ids in unsuspended.items()}
+
+    # Step 4: make sure any cards tagged locked are suspended, including the ones created above
+    actions.append({'action': 'suspend', 'params': {}, 'cards_query': all_of(tag('locked'), negate(state('suspended')))})
+
+    return {'summary': summary, 'actions': actions}
+
+
+def plan_digest(plan):
+    return hashlib.sha256(json.dumps(plan['actions'], sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def action_digest(action):
+    return hashlib.sha256(json.dumps(action, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def save_json(data, file_path):
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False)
+    os.replace(temp_path, file_path)
+
+
+def load_checkpoint(checkpoint_file=CHECKPOINT_FILE):
+    """Return the unfinished checkpoint left by an interrupted apply, if any."""
+    # The first line holds the plan, every further line the indexes of one applied chunk
+    try:
+        with open(checkpoint_file, 'r', encoding='utf-8') as file:
+            checkpoint = json.loads(file.readline())
+            done = set()
+            for line in file:
+                try:
+                    done.update(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # Cut off by the interruption, that chunk is simply applied again
+    except FileNotFoundError:
+        return None
+    checkpoint['done'] = sorted(done)
+    return checkpoint
+
+
+def _already_applied(result):
+    # A note added by a chunk that was cut off before its progress line was written
+    return result.action == 'addNote' and DUPLICATE_NOTE_ERROR in str(result.error)
+
+
+def apply_plan(anki, plan, checkpoint_file=CHECKPOINT_FILE, chunk_size=APPLY_CHUNK_SIZE):
+    """Send a plan to Anki in batched chunks, recording progress in a checkpoint file.
+
+    If a previous apply of the same plan was interrupted, the actions it already
+    completed are skipped, and notes it added without recording them count as
+    applied. The checkpoint is removed once every action succeeded, or once an
+    action failed APPLY_ATTEMPTS times so the next run plans afresh. Failures are
+    counted per action and carried over to a replanned plan that still has it.
+    """
+    digest = plan_digest(plan)
+    checkpoint = load_checkpoint(checkpoint_file)
+    resumed = checkpoint is not None and checkpoint['digest'] == digest
+    done = set(checkpoint['done']) if resumed else set()
+    keys = [action_digest(action) for action in plan['actions']]
+    failures = checkpoint.get('failures', {}) if checkpoint is not None else {}
+    failures = {key: failures[key] for key in set(keys) if key in failures}
+    remaining = [i for i in range(len(plan['actions'])) if i not in done]
+    errors = []
+    # The plan is written once and progress appended to it, rewriting the whole
+    # checkpoint after every chunk made applying a large plan quadratic
+    save_json({'digest': digest, 'plan': plan, 'failures': failures}, checkpoint_file)
+
+    with open(checkpoint_file, 'a', encoding='utf-8') as progress:
+        progress.write('\n' + json.dumps(sorted(done)) + '\n')
+        for start in range(0, len(remaining), chunk_size):
+            pending = []
+            applied = []
+            for i in remaining[start:start + chunk_size]:
+                action = plan['actions'][i]
+                params = action['params']
+                if 'cards_query' in action:
+                    anki.flush()
+                    params = dict(params, cards=anki.invoke('findCards', query=action['cards_query']))
+                    if not params['cards']:
+                        applied.append(i)
+                        continue
+                pending.append((i, anki.queue(action['action'], **params)))
+            anki.flush()
+            for i, result in pending:
+                if result.error is None or _already_applied(result):
+                    applied.append(i)
+                else:
+                    failures[keys[i]] = failures.get(keys[i], 0) + 1
+                    errors.append(f"{result.action}: {result.error}")
+            progress.write(json.dumps(applied) + '\n')
+            progress.flush()
+            done.update(applied)
+
+    # Only the actions still left over keep their count
+    failures = {keys[i]: failures[keys[i]] for i in range(len(keys)) if i not in done and keys[i] in failures}
+    attempts = max(failures.values(), default=0)
+    if attempts >= APPLY_ATTEMPTS:
+        os.remove(checkpoint_file)
+        raise AnkiConnectError(f"{len(errors)} actions failed, one of them {attempts} times, dropped the checkpoint "
+                               f"so the next run plans afresh. First error: {errors[0]}")
+    if errors:
+        # Written again once so the next apply, of this plan or a replanned one, sees the new counts
+        save_json({'digest': digest, 'plan': plan, 'failures': failures}, checkpoint_file)
+        with open(checkpoint_file, 'a', encoding='utf-8') as progress:
+            progress.write('\n' + json.dumps(sorted(done)) + '\n')
+        raise AnkiConnectError(f"{len(errors)} actions failed, rerun to retry them or delete {checkpoint_file} "
+                               f"to plan afresh. First error: {errors[0]}")
+    if os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)